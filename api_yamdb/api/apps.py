@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from django.core.signals import request_finished, request_started
+
+        from api_yamdb.db_pool import (check_persistent_connections,
+                                       mark_released)
+
+        from . import signals  # noqa: F401
+
+        request_started.connect(check_persistent_connections)
+        request_finished.connect(mark_released)
@@ -0,0 +1,147 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import User
+
+from .metrics import registry
+
+CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+VERSION_CLAIM = 'token_version'
+
+
+def access_token_for(user):
+    """AccessToken с ролью, флагами и версией токенов пользователя."""
+    token = AccessToken.for_user(user)
+    token['iat'] = int(time.time())
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def user_state_key(user_id):
+    return f'jwt-user:{user_id}'
+
+
+def user_state(user_id):
+    """(is_active, token_version) пользователя или None, если его нет.
+
+    Значение хранится в общем кеше JWT_USER_STATE_CACHE_TIMEOUT секунд,
+    так что проверка токена обычно обходится без запроса к БД.
+    """
+    key = user_state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values_list(
+            'is_active', 'token_version'
+        ).first()
+        if state is not None:
+            state = tuple(state)
+            cache.set(key, state, settings.JWT_USER_STATE_CACHE_TIMEOUT)
+    return state
+
+
+def forget_user_state(user_id):
+    """Сбрасывает кеш user_state сразу и ещё раз после коммита.
+
+    Повторный сброс убирает значение, которое параллельный запрос мог
+    прочитать из БД до коммита; остальные гонки ограничены TTL.
+    """
+    key = user_state_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def revoke_tokens(user_id):
+    """Отзывает все выданные пользователю токены."""
+    User.objects.filter(pk=user_id).update(
+        token_version=F('token_version') + 1
+    )
+    forget_user_state(user_id)
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, собранный из claims токена без запроса к БД."""
+
+    def __init__(self, token, claims=None):
+        super().__init__(token)
+        self.claims = token if claims is None else claims
+
+    @cached_property
+    def username(self):
+        return self.claims.get('username', '')
+
+    @cached_property
+    def is_staff(self):
+        return self.claims.get('is_staff', False)
+
+    @cached_property
+    def is_superuser(self):
+        return self.claims.get('is_superuser', False)
+
+    @cached_property
+    def role(self):
+        return self.claims.get('role', User.USER)
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, которая берёт роль из claims токена.
+
+    Вместо чтения пользователя на каждый запрос проверяются is_active и
+    token_version из общего кеша (см. user_state). Токен с устаревшей
+    версией (роль или флаги менялись, см. revoke_tokens) отклоняется,
+    как и токен удалённого или неактивного пользователя. Токены без
+    claims проверяются по БД, как раньше.
+    """
+
+    def authenticate(self, request):
+        try:
+            return super().authenticate(request)
+        except AuthenticationFailed as error:
+            codes = error.get_codes()
+            reason = codes.get('code') if isinstance(codes, dict) else codes
+            registry.inc('yamdb_auth_failures_total', {'reason': reason})
+            raise
+
+    def get_user(self, validated_token):
+        if not all(
+            claim in validated_token for claim in (*CLAIMS, VERSION_CLAIM)
+        ):
+            user = super().get_user(validated_token)
+            return ClaimsUser(
+                validated_token,
+                {claim: getattr(user, claim) for claim in CLAIMS},
+            )
+
+        state = user_state(validated_token.get(api_settings.USER_ID_CLAIM))
+        if state is None:
+            raise AuthenticationFailed(
+                'User not found', code='user_not_found'
+            )
+        is_active, version = state
+        if not is_active:
+            raise AuthenticationFailed(
+                'User is inactive', code='user_inactive'
+            )
+        if version != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Token has been revoked', code='token_revoked'
+            )
+        return ClaimsUser(validated_token)
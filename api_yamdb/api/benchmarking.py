@@ -0,0 +1,70 @@
+import math
+import time
+from contextlib import nullcontext
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, fraction):
+    """Перцентиль по методу ближайшего ранга, values уже отсортированы."""
+    if not values:
+        return None
+    rank = max(math.ceil(fraction * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Сводка по длительностям запросов в секундах: перцентили в мс и RPS."""
+    latencies = sorted(latencies)
+    report = {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+    for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        value = percentile(latencies, fraction)
+        report[name] = None if value is None else round(value * 1000, 2)
+    return report
+
+
+def measure_endpoint(client, method, url, repeat, rollback=False,
+                     before_request=None, **kwargs):
+    """Выполняет запрос repeat раз и сводит время и число SQL-запросов.
+
+    При rollback=True каждый запрос выполняется в транзакции, которая
+    откатывается, поэтому изменяющие запросы можно повторять на тех же
+    данных.
+    """
+    latencies = []
+    queries = []
+    errors = 0
+    for _ in range(repeat):
+        if before_request is not None:
+            before_request()
+        with transaction.atomic() if rollback else nullcontext():
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, **kwargs)
+                latencies.append(time.perf_counter() - started)
+            if rollback:
+                transaction.set_rollback(True)
+        queries.append(len(context.captured_queries))
+        if response.status_code >= 400:
+            errors += 1
+    report = summarize(latencies, sum(latencies), errors=errors)
+    report['status'] = response.status_code
+    report['queries'] = round(sum(queries) / len(queries), 2)
+    report['max_queries'] = max(queries)
+    return report
+
+
+def per_item_cost(function, items, repeat):
+    """Лучшее за repeat запусков время function() в мкс на элемент."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 10 ** 6 / max(items, 1), 2)
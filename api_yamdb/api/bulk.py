@@ -0,0 +1,362 @@
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Q
+from rest_framework.exceptions import AuthenticationFailed
+from reviews.models import (Categories, Genres, GenreTitle, Review, Title,
+                            TitleFacet)
+from search.indexing import index_objects
+from users.models import User
+
+from .cache import invalidate_on_commit
+from .permissions import is_admin
+from .serializers import (ReviewBulkItemSerializer, ReviewSerializer,
+                          TitleBulkItemSerializer)
+
+
+def item_error(index, errors):
+    return {'index': index, 'status': 400, 'errors': errors}
+
+
+def validate_items(items, user):
+    """Проверяет поля каждого отзыва без запросов к БД."""
+    valid = {}
+    results = {}
+    can_set_author = is_admin(user)
+    for index, item in enumerate(items):
+        serializer = ReviewBulkItemSerializer(data=item)
+        if not serializer.is_valid():
+            results[index] = item_error(index, serializer.errors)
+        elif 'author' in serializer.validated_data and not can_set_author:
+            results[index] = item_error(
+                index, {'author': ['Only admins can set the author.']}
+            )
+        else:
+            valid[index] = serializer.validated_data
+    return valid, results
+
+
+def fetch_reviews_ids(reviews):
+    """Достаёт id отзывов после bulk_create, если СУБД их не вернула."""
+    if all(review.pk for review in reviews):
+        return
+    ids = {
+        (title_id, author_id): pk
+        for pk, title_id, author_id in Review.objects.filter(
+            title_id__in={review.title_id for review in reviews},
+            author_id__in={review.author_id for review in reviews},
+        ).values_list('pk', 'title_id', 'author_id')
+    }
+    for review in reviews:
+        review.pk = ids[(review.title_id, review.author_id)]
+
+
+@transaction.atomic
+def create_reviews(items, user):
+    """Создаёт отзывы пачкой и возвращает результат по каждому элементу.
+
+    Поля проверяются без запросов, затем одним запросом блокируются
+    произведения, одним — находятся авторы и одним — уже существующие
+    пары (произведение, автор). Отзывы вставляются через bulk_create,
+    рейтинг пересчитывается один раз на произведение.
+    """
+    valid, results = validate_items(items, user)
+    title_ids = {data['title'] for data in valid.values()}
+    # Блокировка произведений не даёт параллельной пачке вставить те же
+    # пары между проверкой и вставкой.
+    titles = set(
+        Title.objects.select_for_update().filter(pk__in=title_ids)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    usernames = {data['author'] for data in valid.values() if 'author' in data}
+    authors = {
+        author.username: author
+        for author in User.objects.filter(
+            Q(username__in=usernames) | Q(pk=user.pk)
+        )
+    }
+    requester = next(
+        (author for author in authors.values() if author.pk == user.pk),
+        None,
+    )
+    if requester is None:
+        # Пользователя удалили после проверки токена.
+        raise AuthenticationFailed('User not found.', code='user_not_found')
+    existing = set(
+        Review.objects.filter(
+            title_id__in=titles,
+            author_id__in=[author.pk for author in authors.values()],
+        ).values_list('title_id', 'author_id')
+    )
+
+    reviews = {}
+    for index, data in valid.items():
+        author = authors.get(data.get('author'), requester)
+        pair = (data['title'], author.pk)
+        if data['title'] not in titles:
+            results[index] = item_error(
+                index, {'title': ['Title not found.']}
+            )
+        elif 'author' in data and data['author'] not in authors:
+            results[index] = item_error(
+                index, {'author': ['User not found.']}
+            )
+        elif pair in existing:
+            results[index] = item_error(
+                index, {'non_field_errors': ['Review already exists.']}
+            )
+        else:
+            existing.add(pair)
+            reviews[index] = Review(
+                title_id=data['title'], author=author,
+                text=data['text'], score=data['score'],
+            )
+
+    created = list(reviews.values())
+    if created:
+        limit = connection.ops.bulk_batch_size(
+            Review._meta.concrete_fields, created
+        )
+        Review.objects.bulk_create(created, batch_size=limit)
+        fetch_reviews_ids(created)
+        update_titles(created)
+    for index, review in reviews.items():
+        results[index] = {
+            'index': index,
+            'status': 201,
+            'review': ReviewSerializer(review).data,
+        }
+    return [results[index] for index in range(len(items))]
+
+
+def update_titles(reviews):
+    """Рейтинг, кеш и поисковый индекс для отзывов из bulk_create.
+
+    bulk_create не отправляет post_save, поэтому то, что делают
+    обработчики сигналов, выполняется здесь один раз на произведение.
+    """
+    stats = defaultdict(lambda: [0, 0])
+    for review in reviews:
+        stats[review.title_id][0] += 1
+        stats[review.title_id][1] += review.score
+    for title_id, (count, total) in sorted(stats.items()):
+        Title.update_rating(title_id, count_delta=count, score_delta=total)
+        invalidate_on_commit(f'reviews:{title_id}')
+    index_objects(reviews, created=True)
+
+
+def natural_key(data):
+    """Естественный ключ произведения для повторного импорта.
+
+    Книга и фильм могут называться одинаково и выйти в один год,
+    поэтому ключ включает категорию.
+    """
+    return data['category'], data['name'], data['year']
+
+
+def validate_titles(items):
+    """Проверяет поля произведений и повторы ключа внутри пачки."""
+    valid = {}
+    results = {}
+    keys = set()
+    for index, item in enumerate(items):
+        serializer = TitleBulkItemSerializer(data=item)
+        if not serializer.is_valid():
+            results[index] = item_error(index, serializer.errors)
+        elif natural_key(serializer.validated_data) in keys:
+            results[index] = item_error(index, {
+                'non_field_errors': [
+                    'Duplicate category, name and year in the batch.'
+                ]
+            })
+        else:
+            keys.add(natural_key(serializer.validated_data))
+            valid[index] = serializer.validated_data
+    return valid, results
+
+
+def resolve_slugs(valid, results):
+    """Находит категории и жанры пачки одним запросом на модель.
+
+    Категории блокируются: параллельная пачка с той же категорией ждёт
+    конца транзакции и уже находит вставленные произведения по ключу.
+    """
+    categories = {
+        category.slug: category
+        for category in Categories.objects.select_for_update().filter(
+            slug__in={data['category'] for data in valid.values()}
+        ).order_by('pk')
+    }
+    genres = dict(
+        Genres.objects.filter(slug__in={
+            slug for data in valid.values() for slug in data.get('genre', [])
+        }).values_list('slug', 'pk')
+    )
+    for index, data in list(valid.items()):
+        errors = {}
+        if data['category'] not in categories:
+            errors['category'] = [f'Unknown category {data["category"]}.']
+        unknown = [
+            slug for slug in data.get('genre', []) if slug not in genres
+        ]
+        if unknown:
+            errors['genre'] = [f'Unknown genres: {", ".join(unknown)}.']
+        if errors:
+            results[index] = item_error(index, errors)
+            del valid[index]
+    return categories, genres
+
+
+def existing_titles(keys, categories):
+    """Произведения с заданными ключами; при повторах — с меньшим id."""
+    slugs = {category.pk: slug for slug, category in categories.items()}
+    titles = {}
+    for title in Title.objects.filter(
+        category_id__in=slugs,
+        name__in={name for _, name, _ in keys},
+        year__in={year for _, _, year in keys},
+    ).order_by('-pk'):
+        titles[(slugs[title.category_id], title.name, title.year)] = title
+    return {key: title for key, title in titles.items() if key in keys}
+
+
+def save_titles(created, updated):
+    """Вставляет новые произведения и обновляет найденные по ключу."""
+    if created:
+        limit = connection.ops.bulk_batch_size(
+            Title._meta.concrete_fields, created
+        )
+        Title.objects.bulk_create(created, batch_size=limit)
+    if created and not all(title.pk for title in created):
+        # SQLite не возвращает id из bulk_create: новые — с наибольшим id.
+        known = {title.pk for title in updated}
+        ids = {}
+        for pk, category_id, name, year in Title.objects.filter(
+            category_id__in={title.category_id for title in created},
+            name__in={title.name for title in created},
+            year__in={title.year for title in created},
+        ).exclude(pk__in=known).order_by('pk').values_list(
+            'pk', 'category_id', 'name', 'year'
+        ):
+            ids[(category_id, name, year)] = pk
+        for title in created:
+            title.pk = ids[(title.category_id, title.name, title.year)]
+    if updated:
+        Title.objects.bulk_update(
+            updated, ['name', 'year', 'description', 'category']
+        )
+
+
+def set_genres(genre_ids):
+    """Приводит жанры произведений к {id произведения: {id жанра}}."""
+    if not genre_ids:
+        return
+    extra = []
+    present = set()
+    for pk, title_id, genre_id in GenreTitle.objects.filter(
+        title_id__in=genre_ids
+    ).values_list('pk', 'title_id', 'genre_id'):
+        if genre_id in genre_ids[title_id]:
+            present.add((title_id, genre_id))
+        else:
+            extra.append(pk)
+    if extra:
+        GenreTitle.objects.filter(pk__in=extra).delete()
+    missing = [
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id, genres in genre_ids.items()
+        for genre_id in genres
+        if (title_id, genre_id) not in present
+    ]
+    if missing:
+        limit = connection.ops.bulk_batch_size(
+            GenreTitle._meta.concrete_fields, missing
+        )
+        GenreTitle.objects.bulk_create(missing, batch_size=limit)
+        # bulk_create не отправляет post_save, удаления выше — отправляют.
+        TitleFacet.adjust(
+            Counter((TitleFacet.GENRE, link.genre_id) for link in missing)
+        )
+
+
+def stored_genres(titles):
+    """Slug жанров произведений после сохранения, по id жанра."""
+    genres = defaultdict(list)
+    for title_id, slug in GenreTitle.objects.filter(
+        title_id__in={title.pk for title in titles}
+    ).exclude(genre=None).order_by('genre_id').values_list(
+        'title_id', 'genre__slug'
+    ):
+        genres[title_id].append(slug)
+    return genres
+
+
+def title_result(index, title, created, genres):
+    return {
+        'index': index,
+        'status': 201 if created else 200,
+        'title': {
+            'id': title.pk,
+            'name': title.name,
+            'year': title.year,
+            'description': title.description,
+            'category': title.category.slug,
+            'genre': genres[title.pk],
+        },
+    }
+
+
+@transaction.atomic
+def upsert_titles(items):
+    """Создаёт или обновляет произведения по ключу (категория, название, год).
+
+    Категории и жанры находятся одним запросом на модель, существующие
+    произведения — одним запросом по ключам. Новые вставляются через
+    bulk_create, найденные обновляются через bulk_update, жанры пачки
+    приводятся к переданным одним удалением и одним bulk_create.
+    Жанры произведения меняются, только если передано поле genre.
+    Счётчики фасетов всей пачки сдвигаются двумя запросами.
+    Возвращает результат по каждому элементу.
+    """
+    valid, results = validate_titles(items)
+    categories, genres = resolve_slugs(valid, results)
+    existing = existing_titles(
+        {natural_key(data) for data in valid.values()}, categories
+    )
+    titles = {}
+    created, updated, previous = [], [], []
+    for index, data in valid.items():
+        title = existing.get(natural_key(data))
+        if title is None:
+            title = Title(name=data['name'], year=data['year'])
+            created.append(title)
+        else:
+            updated.append(title)
+            previous.append((title.category_id, title.year))
+        title.category = categories[data['category']]
+        if 'description' in data:
+            title.description = data['description']
+        titles[index] = title
+    with TitleFacet.deferred():
+        save_titles(created, updated)
+        set_genres({
+            titles[index].pk: {genres[slug] for slug in data['genre']}
+            for index, data in valid.items() if 'genre' in data
+        })
+        TitleFacet.adjust(TitleFacet.title_deltas(
+            added=[
+                (title.category_id, title.year) for title in titles.values()
+            ],
+            removed=previous,
+        ))
+    if titles:
+        invalidate_on_commit('titles')
+        index_objects(created, created=True)
+        index_objects(updated)
+    new = {id(title) for title in created}
+    genres = stored_genres(titles.values())
+    for index, title in titles.items():
+        results[index] = title_result(
+            index, title, id(title) in new, genres
+        )
+    return [results[index] for index in range(len(items))]
@@ -0,0 +1,149 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from api_yamdb.replicas import pin_to_primary
+
+from .metrics import registry
+
+
+def version_key(namespace):
+    return f'response-version:{namespace}'
+
+
+def get_versions(namespaces):
+    """Возвращает текущие версии пространств имён кеша ответов.
+
+    Версия — время последнего изменения в наносекундах, поэтому она же
+    служит значением Last-Modified.
+    """
+    keys = [version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if versions.get(key) is None:
+            # Версия начинается со времени, чтобы после вытеснения ключа
+            # не ожили записи со старыми номерами.
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key, time.time_ns())
+    return [versions[key] for key in keys]
+
+
+def pin_fresh_reads(versions):
+    """Недавно изменённые данные читаются из default.
+
+    Реплика может отставать, и ответ с её устаревшими данными попал бы
+    в кеш под новой версией.
+    """
+    age = time.time_ns() - max(versions, default=0)
+    if age < settings.READ_YOUR_WRITES_WINDOW * 10 ** 9:
+        pin_to_primary()
+
+
+def invalidate(*namespaces):
+    """Сбрасывает кеш ответов, зависящих от пространств имён."""
+    for namespace in namespaces:
+        key = version_key(namespace)
+        version = max(time.time_ns(), (cache.get(key) or 0) + 1)
+        cache.set(key, version, None)
+
+
+def invalidate_on_commit(*namespaces):
+    transaction.on_commit(lambda: invalidate(*namespaces))
+
+
+def response_signature(view, request, kwargs, versions):
+    """Хеш ответа по действию, параметрам запроса и версиям данных."""
+    params = sorted(request.query_params.lists())
+    signature = repr((view.basename, view.action, kwargs, params, versions))
+    return md5(signature.encode()).hexdigest()
+
+
+class CachedListMixin:
+    """Кеширует ответы list до изменения данных в cache_namespaces.
+
+    Ключ учитывает параметры запроса (фильтры, поиск, страницу) и версии
+    пространств имён, которые сдвигаются обработчиками из api/signals.py.
+    """
+    cache_namespaces = ()
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def get_cache_timeout(self):
+        return settings.RESPONSE_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.get_cache_namespaces())
+        signature = response_signature(self, request, kwargs, versions)
+        key = f'response:{signature}'
+        data = cache.get(key)
+        registry.inc(
+            'yamdb_cache_requests_total',
+            {'cache': 'response', 'result': 'miss' if data is None else 'hit'},
+        )
+        if data is not None:
+            return Response(data)
+        pin_fresh_reads(versions)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.get_cache_timeout())
+        return response
+
+
+class CachedResponseMixin(CachedListMixin):
+    """Кеширует ответы list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Поддерживает условные GET по ETag и Last-Modified.
+
+    Оба значения выводятся из версий cache_namespaces представления,
+    поэтому ответ 304 отдаётся без запросов к БД и сериализации. Версии
+    читаются из общего кеша на каждый запрос: воркер с процессной копией
+    версий ответил бы 304 на уже изменённые данные (см. gunicorn.conf.py).
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.get_cache_namespaces())
+        etag = quote_etag(
+            response_signature(self, request, kwargs, versions)
+        )
+        last_modified = max(versions) // 10 ** 9
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        registry.inc('yamdb_cache_requests_total', {
+            'cache': 'conditional',
+            'result': 'miss' if response is None else 'hit',
+        })
+        if response is None:
+            pin_fresh_reads(versions)
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
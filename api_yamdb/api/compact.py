@@ -0,0 +1,155 @@
+from collections import defaultdict
+from operator import attrgetter
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+from reviews.models import GenreTitle
+
+from .timing import measure
+
+datetime_field = serializers.DateTimeField()
+
+
+class CompactSerializer:
+    """Сериализация списков только для чтения без ModelSerializer.
+
+    Строки читаются через values_list(named=True) и сразу собираются в
+    dict. columns — {поле ответа: колонки values_list} в порядке полей
+    исходного сериализатора. Значение поля строит метод
+    represent_<поле>(row, related), иначе берётся его единственная
+    колонка. JSON ответа совпадает с исходным сериализатором байт в байт
+    (см. tests/test_compact.py).
+    """
+    columns = {}
+
+    def __init__(self, fields=None):
+        self.fields = [
+            name for name in self.columns if fields is None or name in fields
+        ]
+
+    def rows(self, queryset, extra=()):
+        """values_list с колонками запрошенных полей и extra."""
+        columns = ['id', *extra]
+        for name in self.fields:
+            columns += self.columns[name]
+        return queryset.select_related(None).prefetch_related(
+            None
+        ).values_list(*dict.fromkeys(columns), named=True)
+
+    def related(self, rows):
+        """Связанные данные страницы, по запросу на связь."""
+        return {}
+
+    def getters(self, related):
+        getters = []
+        for name in self.fields:
+            method = getattr(self, f'represent_{name}', None)
+            if method is None:
+                getter = attrgetter(*self.columns[name])
+            else:
+                getter = self.bind(method, related)
+            getters.append((name, getter))
+        return getters
+
+    @staticmethod
+    def bind(method, related):
+        return lambda row: method(row, related)
+
+    def represent(self, rows, related):
+        getters = self.getters(related)
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+    def serialize(self, rows):
+        rows = list(rows)
+        return self.represent(rows, self.related(rows))
+
+    def represent_pub_date(self, row, related):
+        return datetime_field.to_representation(row.pub_date)
+
+
+class ReviewCompactSerializer(CompactSerializer):
+    """Аналог ReviewSerializer для списков."""
+    columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'title': ('title_id',),
+    }
+
+
+class CommentCompactSerializer(CompactSerializer):
+    """Аналог CommentSerializer для списков."""
+    columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+    }
+
+
+class TitleCompactSerializer(CompactSerializer):
+    """Аналог TitleViewSerializer для списков."""
+    columns = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'category': ('category__name', 'category__slug'),
+        'genre': (),
+        'rating': ('rating',),
+    }
+
+    def related(self, rows):
+        if 'genre' not in self.fields:
+            return {}
+        genres = defaultdict(list)
+        # Порядок как у prefetch_related('genre'): по id жанра.
+        for title_id, name, slug in GenreTitle.objects.filter(
+            title_id__in={row.id for row in rows}
+        ).exclude(genre=None).order_by('genre_id').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        ):
+            genres[title_id].append({'name': name, 'slug': slug})
+        return {'genre': genres}
+
+    def represent_category(self, row, related):
+        if row.category__slug is None:
+            return None
+        return {'name': row.category__name, 'slug': row.category__slug}
+
+    def represent_genre(self, row, related):
+        return related['genre'].get(row.id, [])
+
+    def represent_rating(self, row, related):
+        return None if row.rating is None else int(row.rating)
+
+
+class CompactListMixin:
+    """Отдаёт list через compact_serializer_class.
+
+    Учитывает ?fields= (SparseFieldsMixin) и колонки курсорной
+    пагинации. Выключается настройкой COMPACT_SERIALIZATION.
+    """
+    compact_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not (
+            settings.COMPACT_SERIALIZATION and self.compact_serializer_class
+        ):
+            return super().list(request, *args, **kwargs)
+        compact = self.compact_serializer_class(
+            getattr(self, 'requested_fields', None)
+        )
+        queryset = compact.rows(
+            self.filter_queryset(self.get_queryset()),
+            extra=getattr(self.pagination_class, 'keyset_fields', ()),
+        )
+        page = self.paginate_queryset(queryset)
+        with measure(request, 'serialize'):
+            data = compact.serialize(queryset if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
@@ -0,0 +1,88 @@
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+from reviews.models import Categories, Genres, GenreTitle, Title, TitleFacet
+
+FACETS = (TitleFacet.GENRE, TitleFacet.CATEGORY, TitleFacet.YEAR)
+
+
+def filtered_counts(queryset, facets):
+    """Счётчики фасетов по отфильтрованным произведениям."""
+    titles = Title.objects.filter(pk__in=queryset.order_by().values('pk'))
+    stats = {
+        TitleFacet.GENRE: lambda: GenreTitle.objects.filter(
+            title__in=titles
+        ).exclude(genre=None).values_list('genre_id').annotate(
+            count=Count('title_id', distinct=True)
+        ),
+        TitleFacet.CATEGORY: lambda: titles.exclude(category=None)
+        .values_list('category_id').annotate(count=Count('id')),
+        TitleFacet.YEAR: lambda: titles.values_list('year')
+        .annotate(count=Count('id')),
+    }
+    return {facet: dict(stats[facet]().order_by()) for facet in facets}
+
+
+def facet_items(facet, counts):
+    """Значения фасета по убыванию числа произведений."""
+    labels = {
+        TitleFacet.GENRE: Genres,
+        TitleFacet.CATEGORY: Categories,
+    }
+    if facet in labels:
+        slugs = dict(
+            labels[facet].objects.filter(pk__in=counts)
+            .values_list('pk', 'slug')
+        )
+        items = [
+            {'slug': slugs[pk], 'count': count}
+            for pk, count in counts.items() if pk in slugs
+        ]
+        key = 'slug'
+    else:
+        items = [
+            {'year': year, 'count': count} for year, count in counts.items()
+        ]
+        key = 'year'
+    return sorted(items, key=lambda item: (-item['count'], item[key]))
+
+
+class FacetsMixin:
+    """Добавляет к ответу list счётчики ?facets=genre,category,year.
+
+    Без фильтров счётчики читаются из TitleFacet, с фильтрами считаются
+    по отфильтрованным произведениям. Ответ с фасетами кешируется
+    вместе со списком.
+    """
+    facets_query_param = 'facets'
+
+    def get_requested_facets(self, request):
+        value = request.query_params.get(self.facets_query_param)
+        if not value:
+            return None
+        facets = list(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        unknown = [name for name in facets if name not in FACETS]
+        if unknown:
+            raise ValidationError({
+                self.facets_query_param: [
+                    f'Unknown facets: {", ".join(unknown)}. '
+                    f'Available: {", ".join(FACETS)}.'
+                ]
+            })
+        return facets
+
+    def list(self, request, *args, **kwargs):
+        facets = self.get_requested_facets(request)
+        response = super().list(request, *args, **kwargs)
+        if facets and response.status_code == 200:
+            response.data['facets'] = self.get_facets(facets)
+        return response
+
+    def get_facets(self, facets):
+        queryset = self.filter_queryset(self.get_queryset())
+        if queryset.query.where:
+            counts = filtered_counts(queryset, facets)
+        else:
+            counts = TitleFacet.counts(facets)
+        return {facet: facet_items(facet, counts[facet]) for facet in facets}
@@ -0,0 +1,182 @@
+import json
+
+from api.authentication import access_token_for
+from api.benchmarking import measure_endpoint
+from api.rankings import refresh_rankings
+from django.core.cache import cache
+from django.core.management import BaseCommand
+from django.test import Client
+from reviews.management.commands.seed_catalog import seed_catalog
+from reviews.models import Categories, Comments, Genres, Review, Title
+from search.indexing import rebuild_index
+from users.models import User
+
+BENCHMARK_USER = 'benchmark-admin'
+
+
+def benchmark_user():
+    user, _ = User.objects.get_or_create(
+        username=BENCHMARK_USER,
+        defaults={'email': f'{BENCHMARK_USER}@yamdb.fake', 'role': User.ADMIN},
+    )
+    return user
+
+
+def endpoints(user):
+    """Запросы ко всем маршрутам api/urls.py на текущих данных.
+
+    Возвращает {имя: (метод, url, параметры запроса)}. Изменяющие запросы
+    выполняются с откатом транзакции (rollback=True).
+    """
+    title = Title.objects.order_by('-review_count', 'pk').first()
+    review = Review.objects.filter(title=title).order_by('pk').first()
+    comment = Comments.objects.filter(review=review).order_by('pk').first()
+    genre = Genres.objects.order_by('pk').first()
+    category = Categories.objects.order_by('pk').first()
+    titles = '/api/v1/titles/'
+    reviews = f'{titles}{title.pk}/reviews/'
+    comments = f'{reviews}{review.pk}/comments/'
+    json_body = {'content_type': 'application/json', 'rollback': True}
+    return {
+        'users-list': ('get', '/api/v1/users/', {}),
+        'users-detail': ('get', f'/api/v1/users/{user.username}/', {}),
+        'users-me': ('get', '/api/v1/users/me/', {}),
+        'titles-list': ('get', titles, {}),
+        'titles-filter': ('get', f'{titles}?genre={genre.slug}', {}),
+        'titles-fields': ('get', f'{titles}?fields=id,name,rating', {}),
+        'titles-facets': ('get', f'{titles}?facets=genre,category,year', {}),
+        'titles-filter-facets': (
+            'get', f'{titles}?genre={genre.slug}&facets=genre,category,year',
+            {},
+        ),
+        'titles-detail': ('get', f'{titles}{title.pk}/', {}),
+        'titles-top': ('get', f'{titles}top/', {}),
+        'titles-top-genre': ('get', f'{titles}top/?genre={genre.slug}', {}),
+        'titles-trending': ('get', f'{titles}trending/', {}),
+        'titles-create': ('post', titles, {
+            'data': {
+                'name': 'Benchmark', 'year': 2000,
+                'genre': [genre.slug], 'category': category.slug,
+            },
+            # Создание произведения читает жанры из формы (getlist).
+            'rollback': True,
+        }),
+        'titles-update': ('patch', f'{titles}{title.pk}/', {
+            'data': {'year': 2001, 'category': category.slug},
+            **json_body,
+        }),
+        'titles-bulk': ('post', f'{titles}bulk/', {
+            'data': [
+                {'name': f'Benchmark {number}', 'year': 2000,
+                 'category': category.slug, 'genre': [genre.slug]}
+                for number in range(20)
+            ],
+            **json_body,
+        }),
+        'genres-list': ('get', '/api/v1/genres/', {}),
+        'categories-list': ('get', '/api/v1/categories/', {}),
+        'search': ('get', f'/api/v1/search/?q={title.name.split()[0]}', {}),
+        'reviews-list': ('get', reviews, {}),
+        'reviews-cursor': ('get', f'{reviews}?cursor=', {}),
+        'reviews-detail': ('get', f'{reviews}{review.pk}/', {}),
+        'reviews-create': ('post', reviews, {
+            'data': {'text': 'Benchmark', 'score': 5}, **json_body,
+        }),
+        'reviews-update': ('patch', f'{reviews}{review.pk}/', {
+            'data': {'score': 7}, **json_body,
+        }),
+        'reviews-bulk': ('post', '/api/v1/reviews/bulk/', {
+            'data': [
+                {'title': pk, 'text': 'Benchmark', 'score': 5}
+                for pk in Title.objects.order_by('pk').values_list(
+                    'pk', flat=True
+                )[:20]
+            ],
+            **json_body,
+        }),
+        'comments-list': ('get', comments, {}),
+        'comments-detail': ('get', f'{comments}{comment.pk}/', {}),
+        'comments-create': ('post', comments, {
+            'data': {'text': 'Benchmark'}, **json_body,
+        }),
+        'auth-signup': ('post', '/api/v1/auth/signup/', {
+            'data': {'username': 'benchmark', 'email': 'bench@yamdb.fake'},
+            **json_body,
+        }),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a synthetic catalog and measures latency and queries '
+        'of every API endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=100)
+        parser.add_argument(
+            '--reviews', type=int, default=10, help='Reviews per title'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=2, help='Comments per review'
+        )
+        parser.add_argument(
+            '--no-seed', action='store_true',
+            help='Benchmark the data already in the database',
+        )
+        parser.add_argument('--seed', type=int, help='Random seed')
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Number of requests per endpoint',
+        )
+        parser.add_argument(
+            '--cold-cache', action='store_true',
+            help='Clear the cache before every request',
+        )
+        parser.add_argument(
+            '--only', action='append',
+            help='Benchmark only the given endpoint, may be repeated',
+        )
+        parser.add_argument(
+            '--json', action='store_true', help='Print the report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        catalog = None
+        if not options['no_seed']:
+            catalog = seed_catalog(
+                titles=options['titles'], reviews=options['reviews'],
+                comments=options['comments'], seed=options['seed'],
+            )
+            rebuild_index()
+            refresh_rankings()
+        user = benchmark_user()
+        client = Client(
+            HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}'
+        )
+        before_request = cache.clear if options['cold_cache'] else None
+        report = {}
+        for name, (method, url, kwargs) in endpoints(user).items():
+            if options['only'] and name not in options['only']:
+                continue
+            report[name] = {
+                'method': method.upper(),
+                'url': url,
+                **measure_endpoint(
+                    client, method, url, options['repeat'],
+                    before_request=before_request, **kwargs,
+                ),
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(
+                {'catalog': catalog, 'endpoints': report}, ensure_ascii=False,
+            ))
+            return
+        for name, result in report.items():
+            self.stdout.write(
+                f'{name} ({result["status"]}): '
+                f'p50 {result["p50"]} ms, p95 {result["p95"]} ms, '
+                f'p99 {result["p99"]} ms, {result["queries"]} queries, '
+                f'{result["throughput"]} req/s'
+            )
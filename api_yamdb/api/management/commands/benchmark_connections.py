@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.benchmarking import summarize
+from django.core.management import BaseCommand
+from django.db import connections
+
+from api_yamdb.db_pool import ConnectionPool
+
+QUERY = 'SELECT 1'
+
+
+def execute(raw):
+    cursor = raw.cursor()
+    try:
+        cursor.execute(QUERY)
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class Strategies:
+    """Способы получить соединение на один запрос API."""
+
+    def __init__(self, alias, pool_size):
+        self.wrapper = connections[alias]
+        self.params = self.wrapper.get_connection_params()
+        self.local = threading.local()
+        self.opened = []
+        self.pool = ConnectionPool(
+            connect=self.connect, check=lambda raw: True,
+            max_size=pool_size, timeout=60,
+        )
+
+    def connect(self):
+        return self.wrapper.get_new_connection(self.params)
+
+    def connect_per_request(self):
+        """Как CONN_MAX_AGE=0: новое соединение на каждый запрос."""
+        raw = self.connect()
+        try:
+            execute(raw)
+        finally:
+            raw.close()
+
+    def persistent(self):
+        """Как CONN_MAX_AGE>0: своё постоянное соединение у потока."""
+        raw = getattr(self.local, 'raw', None)
+        if raw is None:
+            raw = self.local.raw = self.connect()
+            self.opened.append(raw)
+        execute(raw)
+
+    def pooled(self):
+        """Как DB_POOL=true: соединение берётся из общего пула."""
+        raw = self.pool.acquire()
+        try:
+            execute(raw)
+        finally:
+            self.pool.release(raw)
+
+    def close(self):
+        for raw in self.opened:
+            raw.close()
+        self.pool.close_idle()
+
+
+def run(strategy, requests, threads):
+    def request(_):
+        started = time.perf_counter()
+        strategy()
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        started = time.perf_counter()
+        latencies = list(executor.map(request, range(requests)))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares per-request connections, persistent connections '
+        'and the connection pool under concurrent load'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--threads', type=int, default=16,
+            help='Number of concurrent clients',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Number of requests per strategy',
+        )
+        parser.add_argument(
+            '--pool-size', type=int,
+            help='Pool size, DB_POOL_SIZE by default',
+        )
+        parser.add_argument(
+            '--json', action='store_true', help='Print the report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        pool_size = options['pool_size'] or connections[
+            alias
+        ].settings_dict.get('POOL', {}).get('MAX_SIZE', 10)
+        strategies = Strategies(alias, pool_size)
+        try:
+            report = {
+                name: run(
+                    getattr(strategies, name), options['requests'],
+                    options['threads'],
+                )
+                for name in ('connect_per_request', 'persistent', 'pooled')
+            }
+            report['pooled']['pool'] = strategies.pool.snapshot()
+        finally:
+            strategies.close()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+        for name, result in report.items():
+            self.stdout.write(
+                f'{name}: {result["throughput"]} req/s, '
+                f'p50 {result["p50"]} ms, p95 {result["p95"]} ms, '
+                f'p99 {result["p99"]} ms'
+            )
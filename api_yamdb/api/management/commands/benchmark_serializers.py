@@ -0,0 +1,108 @@
+import json
+
+from api.benchmarking import per_item_cost
+from api.compact import (CommentCompactSerializer, ReviewCompactSerializer,
+                         TitleCompactSerializer)
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleViewSerializer)
+from django.core.management import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from reviews.management.commands.seed_catalog import seed_catalog
+from reviews.models import Comments, Review, Title
+
+
+def cases():
+    """{имя: (queryset как в представлении, сериализатор DRF, компактный)}."""
+    return {
+        'titles': (
+            Title.objects.select_related('category')
+            .prefetch_related('genre').order_by('pk'),
+            TitleViewSerializer,
+            TitleCompactSerializer,
+        ),
+        'reviews': (
+            Review.objects.select_related('author'),
+            ReviewSerializer,
+            ReviewCompactSerializer,
+        ),
+        'comments': (
+            Comments.objects.select_related('author'),
+            CommentSerializer,
+            CommentCompactSerializer,
+        ),
+    }
+
+
+def compare(queryset, serializer_class, compact_class, items, repeat):
+    """Стоимость сериализации элемента без учёта запросов к БД."""
+    instances = list(queryset[:items])
+    compact = compact_class()
+    rows = list(compact.rows(queryset[:items]))
+    related = compact.related(rows)
+    drf = serializer_class(instances, many=True).data
+    fast = compact.represent(rows, related)
+    renderer = JSONRenderer()
+    drf_us = per_item_cost(
+        lambda: serializer_class(instances, many=True).data,
+        len(instances), repeat,
+    )
+    compact_us = per_item_cost(
+        lambda: compact.represent(rows, related), len(rows), repeat,
+    )
+    return {
+        'items': len(instances),
+        'drf_us': drf_us,
+        'compact_us': compact_us,
+        'speedup': round(drf_us / compact_us, 1) if compact_us else None,
+        'identical': renderer.render(drf) == renderer.render(fast),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares per-item cost of the DRF serializers and the compact '
+        'serializers of list responses'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items', type=int, default=1000,
+            help='Number of objects serialized per run',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Number of runs, the best one is reported',
+        )
+        parser.add_argument(
+            '--no-seed', action='store_true',
+            help='Benchmark the data already in the database',
+        )
+        parser.add_argument('--seed', type=int, help='Random seed')
+        parser.add_argument(
+            '--json', action='store_true', help='Print the report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        items = options['items']
+        if not options['no_seed']:
+            # По одному отзыву и комментарию на произведение: каждого
+            # вида объектов ровно items.
+            seed_catalog(
+                titles=items, reviews=1, comments=1, seed=options['seed'],
+            )
+        report = {
+            name: compare(*case, items, options['repeat'])
+            for name, case in cases().items()
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+        for name, result in report.items():
+            self.stdout.write(
+                f'{name} ({result["items"]} items): '
+                f'DRF {result["drf_us"]} us/item, '
+                f'compact {result["compact_us"]} us/item, '
+                f'x{result["speedup"]}, '
+                f'identical JSON: {result["identical"]}'
+            )
@@ -0,0 +1,106 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from api.benchmarking import summarize
+from django.core.management import BaseCommand, CommandError
+
+READ_PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/genres/',
+    '/api/v1/categories/',
+    '/api/v1/titles/{title_id}/reviews/',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+)
+
+
+def fetch(url, timeout):
+    """Выполняет GET, возвращает (длительность в секундах, успех)."""
+    started = time.perf_counter()
+    try:
+        with urlopen(Request(url), timeout=timeout) as response:
+            response.read()
+            ok = response.status < 400
+    except (URLError, OSError):
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def run_load(urls, total, concurrency, timeout):
+    """Отправляет total запросов по кругу из urls в concurrency потоков."""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        results = list(executor.map(
+            lambda number: fetch(urls[number % len(urls)], timeout),
+            range(total),
+        ))
+        elapsed = time.perf_counter() - started
+    return summarize(
+        [latency for latency, ok in results if ok], elapsed,
+        errors=sum(1 for _, ok in results if not ok),
+    )
+
+
+def parse_target(value):
+    name, _, url = value.partition('=')
+    if not url:
+        name, url = value, value
+    return name, url.rstrip('/')
+
+
+class Command(BaseCommand):
+    help = 'Measures throughput of the read endpoints of running servers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', type=parse_target, required=True,
+            help='Server to test as name=url, may be repeated',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Number of requests per target',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=64,
+            help='Number of concurrent clients',
+        )
+        parser.add_argument(
+            '--title-id', type=int, default=1,
+            help='Title used for the review and comment lists',
+        )
+        parser.add_argument(
+            '--review-id', type=int, default=1,
+            help='Review used for the comment list',
+        )
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument(
+            '--json', action='store_true', help='Print the report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+        paths = [
+            path.format(
+                title_id=options['title_id'], review_id=options['review_id']
+            )
+            for path in READ_PATHS
+        ]
+        report = {}
+        for name, base_url in options['target']:
+            report[name] = run_load(
+                [base_url + path for path in paths], options['requests'],
+                options['concurrency'], options['timeout'],
+            )
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+        for name, result in report.items():
+            self.stdout.write(
+                f'{name}: {result["throughput"]} req/s, '
+                f'p50 {result["p50"]} ms, p95 {result["p95"]} ms, '
+                f'p99 {result["p99"]} ms, errors {result["errors"]}'
+            )
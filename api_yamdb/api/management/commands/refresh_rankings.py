@@ -0,0 +1,28 @@
+import time
+
+from api.rankings import refresh_rankings
+from django.conf import settings
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the top-rated and trending title rankings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep refreshing the rankings instead of exiting',
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            default=settings.RANKING_REFRESH_INTERVAL,
+            help='Seconds between refreshes with --loop',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            places = refresh_rankings()
+            self.stdout.write(f'Refreshed rankings: {places} places')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
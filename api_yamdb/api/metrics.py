@@ -0,0 +1,223 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+HELP = {
+    'yamdb_request_duration_seconds': 'Request latency by route',
+    'yamdb_responses_total': 'Responses by route and status',
+    'yamdb_db_queries_total': 'SQL queries executed by route',
+    'yamdb_cache_requests_total': 'Response cache lookups by result',
+    'yamdb_auth_failures_total': 'Rejected authentication attempts',
+    'yamdb_db_pool_connections': 'Pooled DB connections by state',
+    'yamdb_db_pool_max_size': 'DB pool size limit',
+    'yamdb_db_pool_events_total': 'DB pool events',
+}
+
+
+def metric_key(name, labels):
+    return json.dumps([name, sorted((labels or {}).items())])
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'),
+        )
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def merge_histogram(total, key, histogram):
+    merged = total.get(key)
+    if merged is None:
+        total[key] = histogram
+        return
+    merged['counts'] = [
+        left + right
+        for left, right in zip(merged['counts'], histogram['counts'])
+    ]
+    merged['sum'] += histogram['sum']
+    merged['count'] += histogram['count']
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Счётчики и гистограммы процесса с агрегацией между воркерами.
+
+    Если задан directory, каждый процесс не чаще раза в flush_interval
+    секунд сохраняет свои значения в файл <pid>.json, а collect()
+    суммирует файлы всех процессов. Счётчики и гистограммы завершившихся
+    процессов учитываются, показатели (gauge) — нет. Без directory видны
+    только значения текущего процесса.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.gauges = {}
+        self.flushed = 0.0
+
+    def inc(self, name, labels=None, value=1):
+        with self.lock:
+            self.counters[metric_key(name, labels)] += value
+        self.flush()
+
+    def set(self, name, value, labels=None):
+        with self.lock:
+            self.gauges[metric_key(name, labels)] = value
+        self.flush()
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = metric_key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': list(buckets),
+                    'counts': [0] * len(buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            for index, bound in enumerate(histogram['buckets']):
+                if value <= bound:
+                    histogram['counts'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {
+                    key: dict(histogram, counts=list(histogram['counts']))
+                    for key, histogram in self.histograms.items()
+                },
+            }
+
+    def flush(self, force=False):
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.flushed < self.flush_interval:
+            return
+        self.flushed = now
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as metrics_file:
+            json.dump(self.snapshot(), metrics_file)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """Суммирует значения всех процессов."""
+        if not self.directory:
+            return self.snapshot()
+        self.flush(force=True)
+        total = {
+            'counters': defaultdict(float),
+            'gauges': defaultdict(float),
+            'histograms': {},
+        }
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as metrics_file:
+                    data = json.load(metrics_file)
+            except (OSError, ValueError):
+                continue
+            for key, value in data['counters'].items():
+                total['counters'][key] += value
+            for key, histogram in data['histograms'].items():
+                merge_histogram(total['histograms'], key, histogram)
+            pid = name[:-len('.json')]
+            if pid.isdigit() and process_alive(int(pid)):
+                for key, value in data.get('gauges', {}).items():
+                    total['gauges'][key] += value
+        return total
+
+    def render(self):
+        """Значения в текстовом формате Prometheus."""
+        data = self.collect()
+        lines = []
+        described = set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f'# HELP {name} {HELP.get(name, name)}')
+                lines.append(f'# TYPE {name} {kind}')
+
+        for key in sorted(data['counters']):
+            name, labels = json.loads(key)
+            describe(name, 'counter')
+            lines.append(
+                f'{name}{format_labels(labels)} '
+                f'{format_value(data["counters"][key])}'
+            )
+        for key in sorted(data['gauges']):
+            name, labels = json.loads(key)
+            describe(name, 'gauge')
+            lines.append(
+                f'{name}{format_labels(labels)} '
+                f'{format_value(data["gauges"][key])}'
+            )
+        for key in sorted(data['histograms']):
+            name, labels = json.loads(key)
+            histogram = data['histograms'][key]
+            describe(name, 'histogram')
+            bounds = [
+                *(format_value(float(bound))
+                  for bound in histogram['buckets']),
+                '+Inf',
+            ]
+            counts = [*histogram['counts'], histogram['count']]
+            for bound, count in zip(bounds, counts):
+                bucket_labels = format_labels([*labels, ['le', bound]])
+                lines.append(f'{name}_bucket{bucket_labels} {count}')
+            lines.append(
+                f'{name}_sum{format_labels(labels)} '
+                f'{format_value(histogram["sum"])}'
+            )
+            lines.append(
+                f'{name}_count{format_labels(labels)} {histogram["count"]}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(
+    directory=settings.METRICS_DIR or None,
+    flush_interval=settings.METRICS_FLUSH_INTERVAL,
+)
+atexit.register(registry.flush, force=True)
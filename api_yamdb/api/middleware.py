@@ -0,0 +1,146 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import registry
+from .timing import PhaseTimer
+
+logger = logging.getLogger('api.requests')
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper: считает запросы и их суммарное время."""
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.duration = 0.0
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed * 1000 >= self.slow_query_ms:
+                self.slow_queries.append({
+                    'sql': sql,
+                    'duration_ms': round(elapsed * 1000, 2),
+                    'database': context['connection'].alias,
+                })
+
+
+def route_name(request):
+    """Имя маршрута вместо пути, чтобы не плодить метки на каждый id."""
+    match = request.resolver_match
+    return match.view_name if match else 'unmatched'
+
+
+class MetricsMiddleware:
+    """Собирает метрики /metrics: время ответа и число SQL по маршрутам."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer(slow_query_ms=float('inf'))
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        labels = {'view': route_name(request), 'method': request.method}
+        registry.observe(
+            'yamdb_request_duration_seconds',
+            time.perf_counter() - started, labels,
+        )
+        registry.inc(
+            'yamdb_responses_total',
+            {'view': labels['view'], 'status': response.status_code},
+        )
+        if timer.count:
+            registry.inc('yamdb_db_queries_total', labels, timer.count)
+        return response
+
+
+class RequestMetricsMiddleware:
+    """Замеряет запросы к API: SQL, сериализацию, рендеринг и размер ответа.
+
+    Замеряется доля REQUEST_METRICS_SAMPLE_RATE запросов, для остальных
+    middleware ничего не делает. Результат отдаётся заголовком
+    Server-Timing и строкой JSON в логгер api.requests; SQL запросов
+    дольше REQUEST_METRICS_SLOW_QUERY_MS попадает в лог целиком.
+    Фаза serialize — время serializer.data (api/timing.py), render —
+    время JSONRenderer. Эти фазы не пересекаются, но SQL, выполненный
+    во время сериализации, входит и в serialize, и в db.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        timer = QueryTimer(settings.REQUEST_METRICS_SLOW_QUERY_MS)
+        request.phase_timer = PhaseTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        metrics = self.collect(request, response, timer, total)
+        response['Server-Timing'] = self.server_timing(metrics)
+        logger.info(
+            json.dumps(metrics, ensure_ascii=False),
+            extra={'metrics': metrics},
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        timer = getattr(request, 'phase_timer', None)
+        if timer is None:
+            return response
+        started = time.perf_counter()
+
+        def rendered(response):
+            timer.durations['render'] = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def collect(self, request, response, timer, total):
+        size = None if response.streaming else len(response.content)
+        durations = request.phase_timer.durations
+        return {
+            'method': request.method,
+            'path': request.path,
+            'view': route_name(request),
+            'status': response.status_code,
+            'queries': timer.count,
+            'db_ms': round(timer.duration * 1000, 2),
+            'serialize_ms': round(durations['serialize'] * 1000, 2),
+            'render_ms': round(durations['render'] * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'response_bytes': size,
+            'slow_queries': timer.slow_queries,
+        }
+
+    def server_timing(self, metrics):
+        return ', '.join((
+            f'db;dur={metrics["db_ms"]};desc="{metrics["queries"]} queries"',
+            f'serialize;dur={metrics["serialize_ms"]}',
+            f'render;dur={metrics["render_ms"]}',
+            f'total;dur={metrics["total_ms"]}',
+        ))
@@ -0,0 +1,167 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+from collections import OrderedDict
+from functools import partial
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .cache import get_versions
+
+
+class CountingPaginator(Paginator):
+    """Paginator, который берёт count из переданной функции."""
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_function = count
+
+    @cached_property
+    def count(self):
+        return self.count_function()
+
+
+class CountedPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination с настраиваемым подсчётом count.
+
+    Режим задаётся атрибутом count_mode представления или настройкой
+    PAGINATION_COUNT_MODE:
+    exact — COUNT(*) на каждый запрос;
+    cached — результат COUNT(*) кешируется на count_timeout секунд
+    и сбрасывается вместе с кешем ответов представления (версии его
+    cache_namespaces входят в ключ);
+    estimate — для запроса без фильтров берётся оценка планировщика
+    PostgreSQL, для остальных — как в cached.
+    """
+    # На маленьких таблицах COUNT(*) дёшев, а оценка планировщика неточна.
+    estimate_threshold = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CountingPaginator, count=self.get_count_function(queryset, view)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_function(self, queryset, view):
+        mode = getattr(view, 'count_mode', settings.PAGINATION_COUNT_MODE)
+        timeout = getattr(
+            view, 'count_timeout', settings.PAGINATION_COUNT_TIMEOUT
+        )
+        if mode == 'exact':
+            return queryset.count
+        if mode == 'estimate' and self.is_unfiltered(queryset):
+            return partial(self.estimated_count, queryset)
+        namespaces = getattr(view, 'get_cache_namespaces', tuple)()
+        return partial(
+            self.cached_count, queryset, timeout, get_versions(namespaces)
+        )
+
+    def is_unfiltered(self, queryset):
+        query = queryset.query
+        return not (query.where or query.distinct or query.combinator)
+
+    def cached_count(self, queryset, timeout, versions=()):
+        sql, params = queryset.query.sql_with_params()
+        key = md5(f'{sql}{params}{versions}'.encode()).hexdigest()
+        return cache.get_or_set(
+            f'pagination-count:{key}', queryset.count, timeout
+        )
+
+    def estimated_count(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return queryset.count()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < self.estimate_threshold:
+            return queryset.count()
+        return row[0]
+
+
+class KeysetPagination(CountedPageNumberPagination):
+    """Постраничная навигация с режимом курсора по ключу (pub_date, id).
+
+    По умолчанию ведёт себя как PageNumberPagination. Если в запросе есть
+    параметр cursor (пустой — первая страница), страница выбирается
+    условием по ключу без OFFSET и COUNT(*), поэтому глубокие страницы
+    стоят столько же, сколько первая.
+    """
+    cursor_query_param = 'cursor'
+    keyset_fields = ('pub_date', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.keyset_fields)
+        position = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        if position is not None:
+            first, second = self.keyset_fields
+            queryset = queryset.filter(
+                Q(**{f'{first}__gt': position[0]})
+                | Q(**{first: position[0], f'{second}__gt': position[1]})
+            )
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        first, second = self.keyset_fields
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(getattr(last, first), getattr(last, second)),
+        )
+
+    def encode_cursor(self, pub_date, pk):
+        position = f'{pub_date.isoformat()}|{pk}'
+        return urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            pub_date, pk = urlsafe_b64decode(
+                cursor.encode()
+            ).decode().split('|')
+            position = (parse_datetime(pub_date), int(pk))
+        except (DecodeError, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
@@ -1,13 +1,14 @@
 from rest_framework import permissions
 
 
+def is_admin(user):
+    """Администратор: роль admin или сотрудник (is_staff)."""
+    return user.is_authenticated and user.is_admin or user.is_staff
+
+
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
-        return (
-            request.user.is_authenticated
-            and request.user.is_admin
-            or request.user.is_staff
-        )
+        return is_admin(request.user)
 
 
 class IsAuthorOrAdmin(permissions.BasePermission):
@@ -21,7 +22,7 @@ class IsAuthorOrAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in ['PATCH', 'DELETE']:
             return (
-                obj.author == request.user
+                obj.author_id == request.user.pk
                 or request.user.is_staff
                 or request.user.get_is_admin
             )
@@ -57,7 +58,7 @@ class IsAuthorOrAdminOrModeratorOrReadOnly(permissions.BasePermission):
 
         if request.method in ['PATCH', 'DELETE']:
             return (
-                obj.author == request.user
+                obj.author_id == request.user.pk
                 or request.user.is_staff
                 or request.user.is_admin
                 or request.user.is_moderator
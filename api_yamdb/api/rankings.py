@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from reviews.models import Categories, Genres, TitleRanking
+
+from .cache import invalidate
+
+
+def refresh_rankings():
+    """Пересобирает рейтинги и сбрасывает кеш их ответов."""
+    places = TitleRanking.refresh(
+        size=settings.RANKING_SIZE,
+        days=settings.RANKING_TRENDING_DAYS,
+        now=timezone.now(),
+    )
+    invalidate('rankings')
+    return places
+
+
+def ranking_scope(params):
+    """scope рейтинга по ?genre= или ?category= со слагом."""
+    genre = params.get('genre')
+    category = params.get('category')
+    if genre and category:
+        raise ValidationError({
+            'non_field_errors': ['Use either genre or category, not both.']
+        })
+    if genre:
+        return f'genre:{get_object_or_404(Genres, slug=genre).pk}'
+    if category:
+        return f'category:{get_object_or_404(Categories, slug=category).pk}'
+    return ''
+
+
+def ranking_limit(params):
+    value = params.get('limit', settings.RANKING_DEFAULT_LIMIT)
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        limit = 0
+    if not 1 <= limit <= settings.RANKING_SIZE:
+        raise ValidationError({
+            'limit': [
+                f'Ensure limit is between 1 and {settings.RANKING_SIZE}.'
+            ]
+        })
+    return limit
+
+
+def ranking_places(board, params):
+    """Места рейтинга board для параметров запроса."""
+    return TitleRanking.objects.filter(
+        board=board, scope=ranking_scope(params)
+    ).select_related('title__category').prefetch_related(
+        'title__genre'
+    )[:ranking_limit(params)]
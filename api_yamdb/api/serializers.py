@@ -1,8 +1,13 @@
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
-from reviews.models import Categories, Comments, Genres, Review, Title
+from reviews.models import (Categories, Comments, Genres, Review, Title,
+                            TitleRanking)
+from search.models import SearchDocument
 from users.models import User
 
+from .sparse import SparseFieldsSerializerMixin
+from .timing import TimedSerializerMixin
+
 
 class Registration(serializers.Serializer):
     email = serializers.EmailField(
@@ -43,7 +48,8 @@ class Confirmation(serializers.Serializer):
     )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin,
+                     serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
@@ -65,10 +71,19 @@ class UserSerializer(serializers.ModelSerializer):
         }
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True
     )
+    query_fields = {
+        'id': {},
+        'text': {'only': ('text',)},
+        'author': {'only': ('author__username',), 'select': ('author',)},
+        'score': {'only': ('score',)},
+        'pub_date': {'only': ('pub_date',)},
+        'title': {'only': ('title',)},
+    }
 
     class Meta:
         model = Review
@@ -78,22 +93,61 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'author', 'title')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class ReviewBulkItemSerializer(serializers.Serializer):
+    title = serializers.IntegerField(min_value=1)
+    text = serializers.CharField()
+    score = serializers.IntegerField(min_value=1, max_value=10)
+    author = serializers.CharField(required=False)
+
+
+class TitleBulkItemSerializer(serializers.Serializer):
+    name = serializers.CharField(
+        max_length=Title._meta.get_field('name').max_length
+    )
+    year = serializers.IntegerField(
+        validators=Title._meta.get_field('year').validators
+    )
+    description = serializers.CharField(
+        max_length=Title._meta.get_field('description').max_length,
+        required=False, allow_blank=True, allow_null=True,
+    )
+    category = serializers.SlugField()
+    genre = serializers.ListField(
+        child=serializers.SlugField(), required=False
+    )
+
+
+class CategorySerializer(TimedSerializerMixin,
+                         serializers.ModelSerializer):
     class Meta:
         fields = ('name', 'slug')
         model = Categories
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin,
+                      serializers.ModelSerializer):
     class Meta:
         fields = ('name', 'slug')
         model = Genres
 
 
-class TitleViewSerializer(serializers.ModelSerializer):
+class TitleViewSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin,
+                          serializers.ModelSerializer):
     genre = GenreSerializer(many=True, required=False, read_only=True)
     category = CategorySerializer(required=False, read_only=True)
     rating = serializers.IntegerField()
+    query_fields = {
+        'id': {},
+        'name': {'only': ('name',)},
+        'year': {'only': ('year',)},
+        'description': {'only': ('description',)},
+        'category': {
+            'only': ('category__name', 'category__slug'),
+            'select': ('category',),
+        },
+        'genre': {'prefetch': ('genre',)},
+        'rating': {'only': ('rating',)},
+    }
 
     class Meta:
         fields = (
@@ -105,7 +159,19 @@ class TitleViewSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'rating')
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleRankingSerializer(TimedSerializerMixin,
+                             serializers.ModelSerializer):
+    rank = serializers.IntegerField(source='position')
+    title = TitleViewSerializer()
+    query_fields = {}
+
+    class Meta:
+        fields = ('rank', 'score', 'title')
+        model = TitleRanking
+
+
+class TitleSerializer(TimedSerializerMixin,
+                      serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field='slug', many=False, queryset=Categories.objects.all()
     )
@@ -117,16 +183,35 @@ class TitleSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('review_count', 'score_sum', 'rating')
         model = Title
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True
     )
+    query_fields = {
+        'id': {},
+        'text': {'only': ('text',)},
+        'author': {'only': ('author__username',), 'select': ('author',)},
+        'pub_date': {'only': ('pub_date',)},
+    }
 
     class Meta:
         model = Comments
         fields = 'id', 'text', 'author', 'pub_date'
         read_only_fields = ('id', 'author')
+
+
+class SearchResultSerializer(TimedSerializerMixin,
+                             serializers.ModelSerializer):
+    id = serializers.IntegerField(source='object_id')
+    rank = serializers.FloatField()
+
+    class Meta:
+        model = SearchDocument
+        fields = (
+            'kind', 'id', 'title_id', 'review_id', 'heading', 'body', 'rank'
+        )
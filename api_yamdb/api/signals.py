@@ -0,0 +1,155 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from reviews.models import (Categories, Comments, Genres, GenreTitle, Review,
+                            Title, TitleFacet)
+from users.models import User
+
+from .authentication import CLAIMS, forget_user_state, revoke_tokens
+from .cache import invalidate_on_commit
+
+RATING_FIELDS = {'review_count', 'score_sum', 'rating'}
+FACET_FIELDS = {'category', 'category_id', 'year'}
+# Поля пользователя, после изменения которых его токены отзываются.
+TOKEN_FIELDS = (*CLAIMS, 'is_active')
+
+
+@receiver([post_save, post_delete], sender=Genres)
+def genre_changed(sender, **kwargs):
+    invalidate_on_commit('genres', 'titles')
+
+
+@receiver([post_save, post_delete], sender=Categories)
+def category_changed(sender, **kwargs):
+    invalidate_on_commit('categories', 'titles')
+
+
+@receiver([post_save, post_delete], sender=Title)
+def title_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= RATING_FIELDS:
+        invalidate_on_commit('title-lists', f'title:{instance.pk}')
+    else:
+        invalidate_on_commit('titles')
+
+
+@receiver([post_save, post_delete], sender=GenreTitle)
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, **kwargs):
+    invalidate_on_commit('titles')
+
+
+@receiver(post_delete, sender=Genres)
+def genre_facet_deleted(sender, instance, **kwargs):
+    TitleFacet.objects.filter(
+        facet=TitleFacet.GENRE, value=instance.pk
+    ).delete()
+
+
+@receiver(post_delete, sender=Categories)
+def category_facet_deleted(sender, instance, **kwargs):
+    TitleFacet.objects.filter(
+        facet=TitleFacet.CATEGORY, value=instance.pk
+    ).delete()
+
+
+@receiver(pre_save, sender=Title)
+def remember_title_facets(sender, instance, update_fields=None, **kwargs):
+    instance.saved_facets = None
+    if instance.pk is None or (
+        update_fields and not set(update_fields) & FACET_FIELDS
+    ):
+        return
+    instance.saved_facets = Title.objects.filter(pk=instance.pk).values_list(
+        'category_id', 'year'
+    ).first()
+
+
+@receiver(post_save, sender=Title)
+def title_facets_saved(sender, instance, created, **kwargs):
+    saved = getattr(instance, 'saved_facets', None)
+    if not created and saved is None:
+        # Например, пересчёт рейтинга: поля фасетов не сохранялись.
+        return
+    current = (instance.category_id, instance.year)
+    if created:
+        TitleFacet.adjust(TitleFacet.title_deltas(added=[current]))
+    elif saved != current:
+        TitleFacet.adjust(
+            TitleFacet.title_deltas(added=[current], removed=[saved])
+        )
+
+
+@receiver(post_delete, sender=Title)
+def title_facets_deleted(sender, instance, **kwargs):
+    TitleFacet.adjust(TitleFacet.title_deltas(
+        removed=[(instance.category_id, instance.year)]
+    ))
+
+
+@receiver([post_save, post_delete], sender=GenreTitle)
+def genre_title_facets(sender, instance, created=True, signal=None,
+                       **kwargs):
+    # Связи только создаются и удаляются, жанр существующей не меняется.
+    if signal is post_delete:
+        TitleFacet.adjust({(TitleFacet.GENRE, instance.genre_id): -1})
+    elif created:
+        TitleFacet.adjust({(TitleFacet.GENRE, instance.genre_id): 1})
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_added(sender, action, reverse, instance, pk_set, **kwargs):
+    # add() вставляет связи через bulk_create без post_save, а remove()
+    # и clear() удаляют через QuerySet.delete() с post_delete на связь.
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        deltas = {(TitleFacet.GENRE, instance.pk): len(pk_set)}
+    else:
+        deltas = {(TitleFacet.GENRE, genre_id): 1 for genre_id in pk_set}
+    TitleFacet.adjust(deltas)
+
+
+@receiver([post_save, post_delete], sender=Review)
+def review_changed(sender, instance, **kwargs):
+    invalidate_on_commit(
+        'title-lists',
+        f'title:{instance.title_id}',
+        f'reviews:{instance.title_id}',
+    )
+
+
+@receiver([post_save, post_delete], sender=Comments)
+def comment_changed(sender, instance, **kwargs):
+    invalidate_on_commit(f'comments:{instance.review_id}')
+
+
+@receiver([post_save, post_delete], sender=User)
+def author_changed(sender, created=False, **kwargs):
+    # У нового пользователя ещё нет отзывов и комментариев.
+    if not created:
+        invalidate_on_commit('authors')
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    forget_user_state(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_claims(sender, instance, update_fields=None, **kwargs):
+    instance.saved_claims = None
+    if instance.pk is None or (
+        update_fields and not set(update_fields) & set(TOKEN_FIELDS)
+    ):
+        return
+    instance.saved_claims = User.objects.filter(pk=instance.pk).values_list(
+        *TOKEN_FIELDS
+    ).first()
+
+
+@receiver(post_save, sender=User)
+def user_claims_changed(sender, instance, created, **kwargs):
+    saved = getattr(instance, 'saved_claims', None)
+    current = tuple(getattr(instance, name) for name in TOKEN_FIELDS)
+    if not created and saved is not None and saved != current:
+        revoke_tokens(instance.pk)
@@ -0,0 +1,84 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет в ответе только поля из context['fields'].
+
+    query_fields описывает, что нужно загрузить из БД для каждого поля:
+    only — колонки для QuerySet.only(), select — связи для
+    select_related(), prefetch — связи для prefetch_related().
+    """
+    query_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """Поддерживает ?fields=a,b для чтения списков и объектов.
+
+    Из ответа убираются остальные поля, а queryset загружает только
+    нужные колонки и связи. Без параметра загружаются связи всех полей.
+    """
+    fields_query_param = 'fields'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.requested_fields = self.get_requested_fields(request)
+
+    def get_requested_fields(self, request):
+        value = request.query_params.get(self.fields_query_param)
+        if request.method not in SAFE_METHODS or not value:
+            return None
+        fields = list(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        available = self.get_serializer_class().query_fields
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise ValidationError({
+                self.fields_query_param: [
+                    f'Unknown fields: {", ".join(unknown)}. '
+                    f'Available: {", ".join(available)}.'
+                ]
+            })
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = getattr(self, 'requested_fields', None)
+        return context
+
+    def filter_queryset(self, queryset):
+        # filter_queryset, а не get_queryset: его переопределяют сами
+        # представления, а этот метод общий для list и get_object.
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return self.prune_queryset(queryset, self.requested_fields)
+
+    def prune_queryset(self, queryset, fields):
+        query_fields = self.get_serializer_class().query_fields
+        plans = [query_fields[name] for name in fields or query_fields]
+        select = {name for plan in plans for name in plan.get('select', ())}
+        prefetch = {
+            name for plan in plans for name in plan.get('prefetch', ())
+        }
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        if fields is None:
+            return queryset
+        # Ключ курсорной пагинации нужен и без соответствующих полей.
+        only = set(getattr(self.pagination_class, 'keyset_fields', ()))
+        for plan in plans:
+            only.update(plan.get('only', ()))
+            only.update(plan.get('select', ()))
+        return queryset.only('pk', *sorted(only))
@@ -0,0 +1,59 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from rest_framework import serializers
+
+
+class PhaseTimer:
+    """Время фаз запроса для RequestMetricsMiddleware.
+
+    Вложенный замер той же фазы не учитывается повторно: вложенный
+    сериализатор уже входит во время внешнего.
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.running = set()
+
+    @contextmanager
+    def measure(self, phase):
+        if phase in self.running:
+            yield
+            return
+        self.running.add(phase)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[phase] += time.perf_counter() - started
+            self.running.discard(phase)
+
+
+def measure(request, phase):
+    """Замер фазы запроса; вне замеряемого запроса ничего не делает."""
+    timer = getattr(request, 'phase_timer', None)
+    return nullcontext() if timer is None else timer.measure(phase)
+
+
+class TimedDataMixin:
+    """Записывает время serializer.data в фазу serialize запроса."""
+
+    @property
+    def data(self):
+        with measure(self.context.get('request'), 'serialize'):
+            return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+
+class TimedSerializerMixin(TimedDataMixin):
+    """TimedDataMixin для сериализатора и его many=True."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = getattr(cls, 'Meta', None)
+        if meta is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = TimedListSerializer
@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, get_token,
-                    send_code)
+                    ReviewViewSet, SearchViewSet, TitleViewSet, UserViewSet,
+                    bulk_reviews, get_token, send_code)
 
 app_name = 'api'
 
@@ -12,6 +12,7 @@ router.register('users', UserViewSet)
 router.register('titles', TitleViewSet)
 router.register('genres', GenreViewSet)
 router.register('categories', CategoryViewSet)
+router.register('search', SearchViewSet, basename='search')
 router.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet,
@@ -27,6 +28,7 @@ authpatterns = [
     path('token/', get_token, name='get_token'),
 ]
 urlpatterns = [
+    path('v1/reviews/bulk/', bulk_reviews, name='bulk_reviews'),
     path('v1/', include(router.urls)),
     path('v1/auth/', include(authpatterns)),
 ]
@@ -1,28 +1,41 @@
 from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
-from rest_framework_simplejwt import tokens
 from reviews.filters import TitleFilter
-from reviews.models import Categories, Genres, Review, Title
+from reviews.models import Categories, Genres, Review, Title, TitleRanking
+from search.indexing import search
+from search.models import SearchDocument
+from users.mailer import enqueue_mail
 from users.models import User
 
+from .authentication import access_token_for
+from .bulk import create_reviews, upsert_titles
+from .cache import CachedListMixin, CachedResponseMixin, ConditionalGetMixin
+from .compact import (CommentCompactSerializer, CompactListMixin,
+                      ReviewCompactSerializer, TitleCompactSerializer)
+from .facets import FacetsMixin
+from .metrics import registry
+from .pagination import CountedPageNumberPagination, KeysetPagination
 from .permissions import (IsAdmin, IsAdminOrReadOnly, IsAuthorOrAdmin,
                           IsAuthorOrAdminOrModeratorOrReadOnly)
+from .rankings import ranking_places
 from .serializers import (CategorySerializer, CommentSerializer, Confirmation,
                           GenreSerializer, Registration, ReviewSerializer,
+                          SearchResultSerializer, TitleRankingSerializer,
                           TitleSerializer, TitleViewSerializer, UserSerializer)
+from .sparse import SparseFieldsMixin
 
 
 class CreateListDestroyViewSet(
@@ -43,11 +56,11 @@ def send_code(request):
         username=username
     )
     confirmation_code = PasswordResetTokenGenerator().make_token(user)
-    send_mail(
+    enqueue_mail(
         'Код подтверждения для Yamdb',
         f'Ваш код подтверждения: {confirmation_code}',
         settings.ADMIN_MAIL,
-        [email]
+        email
     )
     answer = {'email': email, 'username': username}
     return Response(
@@ -64,14 +77,59 @@ def get_token(request):
     confirmation_code = serializer.data.get('confirmation_code')
     user = get_object_or_404(User, username=username)
     if not PasswordResetTokenGenerator().check_token(user, confirmation_code):
+        registry.inc(
+            'yamdb_auth_failures_total', {'reason': 'confirmation_code'}
+        )
         return Response(
             {'confirmation_code': 'Invalid confirmation code'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    token = tokens.AccessToken.for_user(user)
+    token = access_token_for(user)
     return Response({'token': f'{token}'}, status=status.HTTP_200_OK)
 
 
+def bulk_items(request, max_items):
+    """Список элементов пакетного запроса."""
+    items = request.data
+    if not isinstance(items, list) or not items:
+        raise ValidationError('Expected a non-empty list.')
+    if len(items) > max_items:
+        raise ValidationError(f'No more than {max_items} items per request.')
+    return items
+
+
+def bulk_response(results):
+    """Ответ с результатами по элементам: 207, если часть не прошла."""
+    failed = sum(1 for result in results if result['status'] >= 400)
+    if failed == len(results):
+        response_status = status.HTTP_400_BAD_REQUEST
+    elif failed:
+        response_status = status.HTTP_207_MULTI_STATUS
+    elif all(result['status'] == 201 for result in results):
+        response_status = status.HTTP_201_CREATED
+    else:
+        response_status = status.HTTP_200_OK
+    return Response({'results': results}, status=response_status)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_reviews(request):
+    """Создаёт список отзывов к одному или нескольким произведениям."""
+    items = bulk_items(request, settings.REVIEW_BULK_MAX_ITEMS)
+    return bulk_response(create_reviews(items, request.user))
+
+
+def metrics(request):
+    """Метрики всех воркеров в текстовом формате Prometheus."""
+    token = settings.METRICS_TOKEN
+    if token and request.META.get('HTTP_AUTHORIZATION') != f'Bearer {token}':
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
+
+
 class UserViewSet(ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -88,7 +146,7 @@ class UserViewSet(ModelViewSet):
         url_name='me'
     )
     def me(self, request, *args, **kwargs):
-        user = self.request.user
+        user = get_object_or_404(User, pk=self.request.user.pk)
         serializer = self.get_serializer(user)
         if self.request.method == 'PATCH':
             if not (user.is_admin or user.is_moderator) and not user.is_staff:
@@ -103,21 +161,72 @@ class UserViewSet(ModelViewSet):
         return Response(serializer.data)
 
 
-class TitleViewSet(ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('review__score')
-    ).order_by('pk')
+class TitleViewSet(SparseFieldsMixin, ConditionalGetMixin, CachedResponseMixin,
+                   FacetsMixin, CompactListMixin, ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('pk')
     serializer_class = TitleSerializer
+    compact_serializer_class = TitleCompactSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = CountedPageNumberPagination
     filterset_class = TitleFilter
     filter_backends = (DjangoFilterBackend, SearchFilter)
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return TitleViewSerializer
+        if self.action in ['top', 'trending']:
+            return TitleRankingSerializer
         return TitleSerializer
 
+    def get_cache_namespaces(self):
+        if self.action == 'retrieve':
+            return ('titles', f'title:{self.kwargs.get("pk")}')
+        if self.action in ['top', 'trending']:
+            return ('titles', 'rankings')
+        return ('titles', 'title-lists')
+
+    def get_cache_timeout(self):
+        timeout = super().get_cache_timeout()
+        if self.action in ['top', 'trending']:
+            # Пересборка в сервисе rankings сбрасывает кеш только через
+            # общий кеш. Ответ не переживает следующую пересборку, даже
+            # если сброс до воркера не дошёл.
+            return min(timeout, settings.RANKING_REFRESH_INTERVAL)
+        return timeout
+
+    @action(methods=['get'], detail=False)
+    def top(self, request):
+        """Произведения с лучшим рейтингом, ?genre= или ?category=."""
+        return self.cached_response(
+            self.ranking, request, board=TitleRanking.TOP
+        )
+
+    @action(methods=['get'], detail=False)
+    def trending(self, request):
+        """Произведения с наибольшим числом отзывов за последние дни."""
+        return self.cached_response(
+            self.ranking, request, board=TitleRanking.TRENDING
+        )
+
+    def ranking(self, request, board):
+        places = list(ranking_places(board, request.query_params))
+        data = {
+            'refreshed': places[0].refreshed_at if places else None,
+            'results': self.get_serializer(places, many=True).data,
+        }
+        if board == TitleRanking.TRENDING:
+            data['days'] = settings.RANKING_TRENDING_DAYS
+        return Response(data)
+
+    @action(methods=['post'], detail=False, url_path='bulk',
+            permission_classes=[IsAdmin])
+    def bulk(self, request):
+        """Создаёт или обновляет произведения по названию и году."""
+        items = bulk_items(request, settings.TITLE_BULK_MAX_ITEMS)
+        return bulk_response(upsert_titles(items))
+
     def perform_create(self, serializer):
         category = Categories.objects.get(
             slug=self.request.data.get('category')
@@ -137,22 +246,24 @@ class TitleViewSet(ModelViewSet):
         return serializer.save(category=category)
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CachedListMixin, CreateListDestroyViewSet):
     queryset = Genres.objects.all()
+    cache_namespaces = ('genres',)
     serializer_class = GenreSerializer
     permission_classes = [IsAdminOrReadOnly, ]
-    pagination_class = PageNumberPagination
+    pagination_class = CountedPageNumberPagination
     filter_backends = (DjangoFilterBackend, SearchFilter)
     filterset_fields = ('name', )
     search_fields = ('name', 'slug')
     lookup_field = 'slug'
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(CachedListMixin, CreateListDestroyViewSet):
     queryset = Categories.objects.all()
+    cache_namespaces = ('categories',)
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = CountedPageNumberPagination
     filter_backends = (SearchFilter, )
     search_fields = ('name',)
 
@@ -168,18 +279,23 @@ class CategoryViewSet(CreateListDestroyViewSet):
         instance.delete()
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(SparseFieldsMixin, ConditionalGetMixin, CompactListMixin,
+                    ModelViewSet):
     serializer_class = ReviewSerializer
+    compact_serializer_class = ReviewCompactSerializer
     permission_classes = [IsAuthorOrAdminOrModeratorOrReadOnly, ]
-    pagination_class = PageNumberPagination
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         title_id = self.kwargs.get('title_id')
         return Review.objects.filter(title_id=title_id).all()
 
+    def get_cache_namespaces(self):
+        return ('authors', f'reviews:{self.kwargs.get("title_id")}')
+
     def create(self, request, *args, **kwargs):
         review_have_this_author = Review.objects.filter(
-            title=self.kwargs.get('title_id'), author=self.request.user
+            title=self.kwargs.get('title_id'), author_id=self.request.user.pk
         ).exists()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -193,18 +309,37 @@ class ReviewViewSet(ModelViewSet):
             serializer.data, status=status.HTTP_201_CREATED, headers=headers
         )
 
+    @transaction.atomic
     def perform_create(self, serializer):
         title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(
-            author=self.request.user,
+        review = serializer.save(
+            author_id=self.request.user.pk,
             title=title,
         )
+        Title.update_rating(title.pk, count_delta=1, score_delta=review.score)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_score = serializer.instance.score
+        review = serializer.save()
+        Title.update_rating(
+            review.title_id, score_delta=review.score - old_score
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        Title.update_rating(
+            instance.title_id, count_delta=-1, score_delta=-instance.score
+        )
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(SparseFieldsMixin, ConditionalGetMixin, CompactListMixin,
+                     ModelViewSet):
     serializer_class = CommentSerializer
+    compact_serializer_class = CommentCompactSerializer
     permission_classes = [IsAuthorOrAdminOrModeratorOrReadOnly, ]
-    pagination_class = PageNumberPagination
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         try:
@@ -217,6 +352,9 @@ class CommentViewSet(ModelViewSet):
             TypeError('Нет ревью на это произведение')
         return review.comments.all()
 
+    def get_cache_namespaces(self):
+        return ('authors', f'comments:{self.kwargs.get("review_id")}')
+
     def perform_create(self, serializer):
         try:
             review = get_object_or_404(
@@ -226,4 +364,18 @@ class CommentViewSet(ModelViewSet):
             )
         except TypeError:
             TypeError('Нет отзыва у этого произведения')
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author_id=self.request.user.pk, review=review)
+
+
+class SearchViewSet(ListModelMixin, GenericViewSet):
+    serializer_class = SearchResultSerializer
+    pagination_class = CountedPageNumberPagination
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        kind = self.request.query_params.get('type')
+        if kind and kind not in dict(SearchDocument.KINDS):
+            raise ValidationError({'type': 'Неизвестный тип документа.'})
+        if not query:
+            return SearchDocument.objects.none()
+        return search(query, kind)
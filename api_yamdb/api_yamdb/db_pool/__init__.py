@@ -0,0 +1,240 @@
+"""Пул соединений с БД и проверка постоянных соединений.
+
+Django 2.2 не умеет ни пула, ни проверки соединений перед запросом
+(CONN_HEALTH_CHECKS появились в 4.1), поэтому здесь есть и то и другое:
+ConnectionPool для бэкенда api_yamdb.db_pool.postgresql и обработчики
+request_started/request_finished для режима CONN_MAX_AGE.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connections
+
+
+class PoolExhaustedError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений одного процесса.
+
+    acquire() отдаёт свободное соединение или открывает новое через
+    connect, пока открыто меньше max_size; иначе ждёт освобождения не
+    дольше timeout секунд. Соединение, простоявшее в пуле дольше
+    check_interval, перед выдачей проверяется функцией check, а открытое
+    раньше max_age секунд назад — переоткрывается.
+
+    После fork дочерний процесс не трогает соединения родителя: через
+    общий сокет их запросы перемешались бы. Они остаются в inherited,
+    чтобы сборщик мусора не закрыл их и не оборвал сеанс родителя.
+    """
+
+    def __init__(self, connect, check, max_size=10, timeout=10.0,
+                 max_age=600.0, check_interval=10.0, on_change=None):
+        self.connect = connect
+        self.check = check
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.on_change = on_change
+        self.condition = threading.Condition()
+        # Свободные соединения: (соединение, время открытия, возврата).
+        self.idle = deque()
+        # Время открытия выданных и свободных соединений по id.
+        self.opened = {}
+        # Открытые соединения вместе с открывающимися прямо сейчас.
+        self.size = 0
+        self.stats = {
+            'opened': 0, 'closed': 0, 'acquired': 0,
+            'waits': 0, 'timeouts': 0, 'failed_checks': 0,
+        }
+        self.pid = os.getpid()
+        self.inherited = []
+
+    def check_fork(self):
+        """Забывает соединения родителя в процессе, созданном fork."""
+        if self.pid == os.getpid():
+            return
+        # Блокировку мог держать поток родителя, которого здесь нет.
+        self.condition = threading.Condition()
+        self.inherited.extend(raw for raw, _, _ in self.idle)
+        self.idle = deque()
+        self.opened = {}
+        self.size = 0
+        self.pid = os.getpid()
+
+    def snapshot(self):
+        with self.condition:
+            return dict(
+                self.stats, size=self.size, idle=len(self.idle),
+                in_use=self.size - len(self.idle), max_size=self.max_size,
+            )
+
+    def acquire(self, connect=None):
+        """Свободное или новое соединение; connect заменяет self.connect."""
+        self.check_fork()
+        with self.condition:
+            item = self.wait_for_slot()
+            self.stats['acquired'] += 1
+        raw = None if item is None else self.reuse(*item)
+        if raw is None:
+            raw = self.open(connect or self.connect)
+        self.changed()
+        return raw
+
+    def wait_for_slot(self):
+        """Берёт свободное соединение или занимает место под новое."""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while not self.idle and self.size >= self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.stats['timeouts'] += 1
+                raise PoolExhaustedError(
+                    f'No free connection in {self.timeout} s '
+                    f'(pool size {self.max_size})'
+                )
+            if not waited:
+                self.stats['waits'] += 1
+                waited = True
+            self.condition.wait(remaining)
+        if self.idle:
+            return self.idle.pop()
+        self.size += 1
+        return None
+
+    def reuse(self, raw, opened, released):
+        """Соединение из пула или None, если его пришлось закрыть.
+
+        Место закрытого соединения остаётся за вызывающим потоком.
+        """
+        now = time.monotonic()
+        if now - opened <= self.max_age and (
+            now - released <= self.check_interval or self.check(raw)
+        ):
+            return raw
+        with self.condition:
+            if now - opened <= self.max_age:
+                self.stats['failed_checks'] += 1
+            self.stats['closed'] += 1
+            self.opened.pop(id(raw), None)
+        self.close_raw(raw)
+        return None
+
+    def open(self, connect):
+        try:
+            raw = connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.opened[id(raw)] = time.monotonic()
+            self.stats['opened'] += 1
+        return raw
+
+    def release(self, raw, reusable=True):
+        """Возвращает соединение в пул или закрывает его."""
+        self.check_fork()
+        with self.condition:
+            opened = self.opened.get(id(raw))
+            if opened is None:
+                # Соединение родителя, выданное до fork.
+                self.inherited.append(raw)
+                return
+            if reusable:
+                self.idle.append((raw, opened, time.monotonic()))
+            else:
+                self.forget(raw)
+            self.condition.notify()
+        if not reusable:
+            self.close_raw(raw)
+        self.changed()
+
+    def forget(self, raw):
+        self.opened.pop(id(raw), None)
+        self.size -= 1
+        self.stats['closed'] += 1
+
+    def close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_idle(self):
+        """Закрывает все свободные соединения."""
+        self.check_fork()
+        with self.condition:
+            idle, self.idle = list(self.idle), deque()
+            for raw, _, _ in idle:
+                self.forget(raw)
+            self.condition.notify_all()
+        for raw, _, _ in idle:
+            self.close_raw(raw)
+        self.changed()
+
+    def changed(self):
+        if self.on_change is not None:
+            self.on_change(self)
+
+
+def report_pool(alias):
+    """Функция on_change пула, публикующая его состояние в /metrics."""
+    from api.metrics import registry
+
+    reported = {}
+    lock = threading.Lock()
+
+    def report(pool):
+        stats = pool.snapshot()
+        labels = {'database': alias}
+        for state in ('idle', 'in_use'):
+            registry.set(
+                'yamdb_db_pool_connections', stats[state],
+                dict(labels, state=state),
+            )
+        registry.set('yamdb_db_pool_max_size', stats['max_size'], labels)
+        for event in ('opened', 'closed', 'acquired', 'waits', 'timeouts',
+                      'failed_checks'):
+            with lock:
+                delta = stats[event] - reported.get(event, 0)
+                reported[event] = max(stats[event], reported.get(event, 0))
+            if delta > 0:
+                registry.inc(
+                    'yamdb_db_pool_events_total',
+                    dict(labels, event=event), delta,
+                )
+
+    return report
+
+
+def mark_released(**kwargs):
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.released_at = now
+
+
+def check_persistent_connections(**kwargs):
+    """Закрывает простоявшие постоянные соединения, если они негодны.
+
+    Соединение проверяется (is_usable, для PostgreSQL — SELECT 1), только
+    если после прошлого запроса прошло больше CONN_HEALTH_CHECK_INTERVAL
+    секунд, поэтому занятые воркеры лишних запросов не делают.
+    """
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or not connection.settings_dict.get(
+            'CONN_MAX_AGE'
+        ):
+            continue
+        released = getattr(connection, 'released_at', now)
+        if now - released > settings.CONN_HEALTH_CHECK_INTERVAL:
+            if not connection.is_usable():
+                connection.close()
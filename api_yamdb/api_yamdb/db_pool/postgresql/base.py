@@ -0,0 +1,99 @@
+"""Бэкенд PostgreSQL с пулом соединений процесса.
+
+Подключается настройкой DB_POOL=true (см. settings.py). Django
+закрывает соединение в конце каждого запроса (CONN_MAX_AGE=0), а этот
+бэкенд вместо закрытия возвращает его в пул, и следующий запрос любого
+потока получает уже открытое соединение без нового рукопожатия.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from .. import ConnectionPool, PoolExhaustedError, report_pool
+
+POOLS = {}
+POOLS_LOCK = threading.Lock()
+
+
+def check_connection(raw):
+    try:
+        with raw.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return True
+    except base.Database.Error:
+        return False
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params):
+        with POOLS_LOCK:
+            pool = POOLS.get(self.alias)
+            if pool is None:
+                options = self.settings_dict.get('POOL', {})
+                pool = POOLS[self.alias] = ConnectionPool(
+                    connect=lambda: base.Database.connect(**conn_params),
+                    check=check_connection,
+                    max_size=options.get('MAX_SIZE', 10),
+                    timeout=options.get('TIMEOUT', 10),
+                    max_age=options.get('MAX_AGE', 600),
+                    check_interval=options.get('CHECK_INTERVAL', 10),
+                    on_change=report_pool(self.alias),
+                )
+        return pool
+
+    def get_new_connection(self, conn_params):
+        try:
+            # Новые соединения открывает базовый бэкенд со всей своей
+            # настройкой соединения.
+            connection = self.get_pool(conn_params).acquire(
+                lambda: super(DatabaseWrapper, self).get_new_connection(
+                    conn_params
+                )
+            )
+        except PoolExhaustedError as error:
+            raise base.Database.OperationalError(str(error)) from error
+        # Соединению из пула уровень изоляции задаётся так же, как в
+        # базовом get_new_connection: до _set_autocommit().
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        raw = self.connection
+        reusable = False
+        try:
+            reusable = self.is_reusable(raw)
+        finally:
+            # Место в пуле освобождается, даже если проверка упала.
+            POOLS[self.alias].release(raw, reusable)
+
+    def is_reusable(self, raw):
+        if raw.closed:
+            return False
+        status = raw.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            # Незавершённая транзакция не должна достаться другому запросу.
+            # В режиме autocommit raw.rollback() ничего не делает.
+            try:
+                if raw.autocommit:
+                    with raw.cursor() as cursor:
+                        cursor.execute('ROLLBACK')
+                else:
+                    raw.rollback()
+            except base.Database.Error:
+                return False
+        if self.errors_occurred:
+            return check_connection(raw)
+        return True
@@ -0,0 +1,96 @@
+"""Чтение с реплик БД с гарантией read-your-writes.
+
+ReplicaMiddleware выбирает базу для каждого запроса: запросы, которые
+могут писать (POST, PATCH, DELETE...), и чтения пользователя в течение
+READ_YOUR_WRITES_WINDOW секунд после его записи идут в default, прочие
+GET — в одну из DATABASE_REPLICAS. ReplicaRouter применяет этот выбор
+ко всем запросам ORM. Вне HTTP-запросов (команды, фоновые задачи)
+всё читается из default.
+
+Время записи клиент приносит сам в подписанной cookie, поэтому любой
+воркер видит его без общего хранилища.
+"""
+import math
+import random
+import threading
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY = 'default'
+PIN_COOKIE = 'read_primary'
+PIN_SALT = 'api_yamdb.replicas'
+
+state = threading.local()
+
+
+def is_pinned(request):
+    """Писал ли клиент меньше READ_YOUR_WRITES_WINDOW секунд назад.
+
+    Подпись хранит время выдачи cookie, так что окно проверяется на
+    сервере, даже если клиент не удалил cookie. Подделка подписи могла
+    бы только отправить чтения в default.
+    """
+    return request.get_signed_cookie(
+        PIN_COOKIE, default=None, salt=PIN_SALT,
+        max_age=settings.READ_YOUR_WRITES_WINDOW,
+    ) is not None
+
+
+def choose_database(request):
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas or request.method not in SAFE_METHODS:
+        return PRIMARY
+    if is_pinned(request):
+        return PRIMARY
+    return random.choice(replicas)
+
+
+def pin_to_primary():
+    """Переводит чтения текущего запроса в default."""
+    if getattr(state, 'database', None) is not None:
+        state.database = PRIMARY
+
+
+class ReplicaMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state.database = choose_database(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            state.database = None
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            response.set_signed_cookie(
+                PIN_COOKIE, PRIMARY, salt=PIN_SALT,
+                max_age=math.ceil(settings.READ_YOUR_WRITES_WINDOW),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class ReplicaRouter:
+    """Направляет чтения в базу, выбранную ReplicaMiddleware."""
+
+    def db_for_read(self, model, **hints):
+        return getattr(state, 'database', None) or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему через репликацию.
+        return db not in settings.DATABASE_REPLICAS
@@ -31,10 +31,13 @@ INSTALLED_APPS = [
     'django_filters',
     'users',
     'reviews',
+    'search',
     'api',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api_yamdb.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -42,6 +45,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.RequestMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -68,6 +72,15 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
+# DB_POOL=true включает пул соединений процесса для PostgreSQL
+# (api_yamdb/db_pool). Без пула соединения переиспользуются между
+# запросами в течение CONN_MAX_AGE секунд и перед запросом проверяются,
+# если простаивали дольше CONN_HEALTH_CHECK_INTERVAL секунд.
+DB_POOL = os.getenv('DB_POOL', default='false').lower() == 'true'
+CONN_HEALTH_CHECK_INTERVAL = float(
+    os.getenv('CONN_HEALTH_CHECK_INTERVAL', default=10)
+)
+
 DATABASES = {
     'default': {
         'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
@@ -75,10 +88,69 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', default=60)),
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_SIZE', default=10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=10)),
+            'MAX_AGE': float(os.getenv('DB_POOL_MAX_AGE', default=600)),
+            'CHECK_INTERVAL': CONN_HEALTH_CHECK_INTERVAL,
+        },
+    }
+}
+if DB_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['ENGINE'] = 'api_yamdb.db_pool.postgresql'
+    # Соединение возвращается в пул в конце каждого запроса.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# Сколько соединений с основной БД могут открыть все воркеры gunicorn
+# вместе. Оставьте запас до max_connections PostgreSQL для остальных
+# сервисов и администрирования, см. gunicorn.conf.py.
+DB_CONNECTION_BUDGET = int(os.getenv('DB_CONNECTION_BUDGET', default=90))
+
+# Реплики для чтения: DB_REPLICAS=host1,host2:5433 (для SQLite — пути
+# к файлам). GET-запросы читают из реплик, см. api_yamdb/replicas.py.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(',')), start=1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DATABASES[alias]['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES[alias]['NAME'] = replica.strip()
+    else:
+        host, _, port = replica.strip().partition(':')
+        DATABASES[alias]['HOST'] = host
+        DATABASES[alias]['PORT'] = port or DATABASES['default']['PORT']
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api_yamdb.replicas.ReplicaRouter']
+# Сколько секунд после записи чтения пользователя идут в default.
+READ_YOUR_WRITES_WINDOW = float(
+    os.getenv('READ_YOUR_WRITES_WINDOW', default=5)
+)
+
+# Cache
+# Кеш ответов и версии данных для ETag должны быть общими для всех
+# процессов: infra/docker-compose.yaml задаёт memcached. LocMemCache
+# подходит для тестов и одного процесса, gunicorn.conf.py не запускает
+# с ним несколько воркеров.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
     }
 }
 
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=3600))
+# Сколько секунд is_active и token_version пользователя живут в кеше.
+JWT_USER_STATE_CACHE_TIMEOUT = int(
+    os.getenv('JWT_USER_STATE_CACHE_TIMEOUT', default=60)
+)
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -121,15 +193,82 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Очередь писем: deliver_mail повторяет отправку с задержкой
+# MAIL_RETRY_BACKOFF * 2 ** (попытка - 1) секунд.
+MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', default=5))
+MAIL_RETRY_BACKOFF = int(os.getenv('MAIL_RETRY_BACKOFF', default=30))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CountedPageNumberPagination',
     'PAGE_SIZE': 5,
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        os.getenv(
+            'JWT_AUTHENTICATION_CLASS',
+            default='api.authentication.StatelessJWTAuthentication'
+        ),
     ],
 }
 
+# Подсчёт count в списках: exact, cached или estimate (см. api/pagination.py).
+PAGINATION_COUNT_MODE = os.getenv('PAGINATION_COUNT_MODE', default='exact')
+PAGINATION_COUNT_TIMEOUT = int(os.getenv('PAGINATION_COUNT_TIMEOUT', default=60))
+
+# Конфигурация полнотекстового поиска PostgreSQL.
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', default='russian')
+
+# Наибольшее число отзывов в одном запросе к /api/v1/reviews/bulk/.
+REVIEW_BULK_MAX_ITEMS = int(os.getenv('REVIEW_BULK_MAX_ITEMS', default=500))
+# То же для /api/v1/titles/bulk/.
+TITLE_BULK_MAX_ITEMS = int(os.getenv('TITLE_BULK_MAX_ITEMS', default=1000))
+
+# Списки произведений, отзывов и комментариев сериализуются из
+# values_list без ModelSerializer (api/compact.py).
+COMPACT_SERIALIZATION = os.getenv(
+    'COMPACT_SERIALIZATION', default='true'
+).lower() == 'true'
+
+# Рейтинги /titles/top/ и /titles/trending/: сколько мест хранится,
+# сколько отдаётся без ?limit=, за сколько дней считаются отзывы
+# и как часто refresh_rankings --loop их пересобирает.
+RANKING_SIZE = int(os.getenv('RANKING_SIZE', default=100))
+RANKING_DEFAULT_LIMIT = int(os.getenv('RANKING_DEFAULT_LIMIT', default=10))
+RANKING_TRENDING_DAYS = int(os.getenv('RANKING_TRENDING_DAYS', default=7))
+RANKING_REFRESH_INTERVAL = int(
+    os.getenv('RANKING_REFRESH_INTERVAL', default=300)
+)
+
+# Доля запросов, которые замеряет RequestMetricsMiddleware (0 — выключено),
+# и порог в мс, начиная с которого SQL запроса пишется в лог.
+REQUEST_METRICS_SAMPLE_RATE = float(
+    os.getenv('REQUEST_METRICS_SAMPLE_RATE', default=0)
+)
+REQUEST_METRICS_SLOW_QUERY_MS = float(
+    os.getenv('REQUEST_METRICS_SLOW_QUERY_MS', default=100)
+)
+
+# Каталог, через который воркеры gunicorn объединяют метрики /metrics.
+# Пустой — метрики только текущего процесса.
+METRICS_DIR = os.getenv('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', default=1))
+# Если задан, /metrics требует заголовок Authorization: Bearer <токен>.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_METRICS_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 ADMIN_MAIL = 'support@yamdb.ru'
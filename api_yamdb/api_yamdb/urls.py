@@ -1,5 +1,6 @@
 
 
+from api.views import metrics
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
@@ -12,4 +13,5 @@ urlpatterns = [
         name='redoc'
     ),
     path('api/', include('api.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
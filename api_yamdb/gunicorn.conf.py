@@ -0,0 +1,71 @@
+import os
+
+# SERVER_MODE=wsgi — синхронные воркеры gunicorn, по запросу на воркер.
+# SERVER_MODE=gthread — воркеры gunicorn с GUNICORN_THREADS потоками,
+# у каждого потока своё соединение с БД.
+SERVER_MODE = os.getenv('SERVER_MODE', default='wsgi')
+
+bind = os.getenv('GUNICORN_BIND', default='0.0.0.0:8000')
+wsgi_app = 'api_yamdb.wsgi:application'
+# Число воркеров задаётся явно: каждый держит свои соединения с БД,
+# см. check_connection_budget.
+workers = int(os.getenv('WEB_CONCURRENCY', default=1))
+
+if SERVER_MODE == 'gthread':
+    worker_class = 'gthread'
+    threads = int(os.getenv('GUNICORN_THREADS', default=8))
+
+# Метрики воркеров объединяются через файлы в METRICS_DIR (см. api/metrics.py).
+os.environ.setdefault('METRICS_DIR', '/tmp/yamdb-metrics')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+# Бэкенды, у которых в каждом процессе своя копия кеша.
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+def check_shared_cache(workers):
+    """Кеш ответов и версии данных (api/cache.py) должны быть общими.
+
+    Иначе воркер, не заметивший сброса версии, отдаёт из своего кеша
+    устаревший ответ, а на условный GET — 304 для изменённых данных.
+    """
+    from django.conf import settings
+
+    backend = settings.CACHES['default']['BACKEND']
+    if workers > 1 and backend in PROCESS_LOCAL_CACHES:
+        raise RuntimeError(
+            f'{workers} workers cannot share {backend}: set CACHE_BACKEND '
+            f'to a shared cache such as memcached or run one worker'
+        )
+
+
+def check_connection_budget(workers, threads):
+    """Воркеры вместе не должны открыть больше DB_CONNECTION_BUDGET соединений.
+
+    Каждый поток воркера держит своё соединение с PostgreSQL, а пул
+    (DB_POOL=true) ограничивает их числом DB_POOL_SIZE на процесс.
+    """
+    from django.conf import settings
+
+    database = settings.DATABASES['default']
+    if database['ENGINE'] == 'django.db.backends.sqlite3':
+        return
+    per_worker = threads
+    if database['ENGINE'] == 'api_yamdb.db_pool.postgresql':
+        per_worker = min(threads, database['POOL']['MAX_SIZE'])
+    if workers * per_worker > settings.DB_CONNECTION_BUDGET:
+        raise RuntimeError(
+            f'{workers} workers with {per_worker} database connections each '
+            f'exceed DB_CONNECTION_BUDGET={settings.DB_CONNECTION_BUDGET}: '
+            f'lower WEB_CONCURRENCY, GUNICORN_THREADS or DB_POOL_SIZE'
+        )
+
+
+def on_starting(server):
+    """Проверяет настройки и удаляет метрики воркеров прошлого запуска."""
+    check_shared_cache(server.cfg.workers)
+    check_connection_budget(server.cfg.workers, server.cfg.threads)
+    directory = os.environ['METRICS_DIR']
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
@@ -0,0 +1,114 @@
+import json
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from reviews.models import Comments, Genres, GenreTitle, Review, Title
+
+TRGM_INDEX = 'title_name_trgm_idx'
+INDEXED_MODELS = (Title, GenreTitle, Review, Comments)
+
+
+def hot_queries():
+    """Запросы API, под которые подобраны индексы, на текущих данных."""
+    busiest = Review.objects.order_by().values('title_id').annotate(
+        reviews=Count('id')
+    ).order_by('-reviews').first()
+    review = Review.objects.filter(title_id=busiest['title_id']).first()
+    title = Title.objects.get(pk=busiest['title_id'])
+    genre = Genres.objects.filter(genretitle__title=title).first()
+    return {
+        'reviews_by_title': Review.objects.filter(
+            title_id=title.pk
+        ).order_by('pk')[:5],
+        'reviews_cursor_page': Review.objects.filter(
+            title_id=title.pk
+        ).order_by('pub_date', 'id')[:6],
+        'review_exists': Review.objects.filter(
+            title_id=title.pk, author_id=review.author_id
+        ).values('id')[:1],
+        'comments_by_review': Comments.objects.filter(
+            review_id=review.pk
+        ).order_by('pk')[:5],
+        'titles_by_genre': Title.objects.filter(
+            genre__slug=genre.slug
+        ).order_by('pk')[:5],
+        'titles_by_category': Title.objects.filter(
+            category_id=title.category_id
+        ).order_by('pk')[:5],
+        'titles_by_year': Title.objects.filter(
+            year=title.year
+        ).order_by('pk')[:5],
+        'titles_name_icontains': Title.objects.filter(
+            name__icontains=title.name[-4:]
+        ).order_by('pk')[:5],
+    }
+
+
+def measure(queryset, repeat):
+    """Возвращает план запроса и среднее время выполнения в мс."""
+    options = {'analyze': True} if connection.vendor == 'postgresql' else {}
+    plan = queryset.explain(**options)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        list(queryset.all())
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    return plan, round(elapsed, 3)
+
+
+def drop_indexes():
+    """Удаляет индексы запросов внутри текущей транзакции."""
+    names = [
+        index.name for model in INDEXED_MODELS for index in model._meta.indexes
+    ]
+    if connection.vendor == 'postgresql':
+        names.append(TRGM_INDEX)
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(
+                f'DROP INDEX IF EXISTS {connection.ops.quote_name(name)}'
+            )
+
+
+class Command(BaseCommand):
+    help = 'Compares query plans and latencies with and without indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Number of runs per query',
+        )
+        parser.add_argument(
+            '--json', action='store_true', help='Print the report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        if not Review.objects.exists():
+            raise CommandError(
+                'No reviews found, seed data first with seed_catalog'
+            )
+        repeat = options['repeat']
+        report = {}
+        # DDL в PostgreSQL и SQLite транзакционный: индексы вернутся
+        # при откате.
+        with transaction.atomic():
+            drop_indexes()
+            for name, queryset in hot_queries().items():
+                report[name] = {'before': measure(queryset, repeat)}
+            transaction.set_rollback(True)
+        # Новое соединение не держит планы, подготовленные без индексов.
+        connection.close()
+        for name, queryset in hot_queries().items():
+            report[name]['after'] = measure(queryset, repeat)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False))
+            return
+        for name, result in report.items():
+            (plan_before, before), (plan_after, after) = (
+                result['before'], result['after']
+            )
+            self.stdout.write(f'== {name}: {before} ms -> {after} ms')
+            self.stdout.write(f'-- without indexes:\n{plan_before}')
+            self.stdout.write(f'-- with indexes:\n{plan_after}')
@@ -1,103 +1,369 @@
+import csv
+import io
+import multiprocessing
 import os
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from contextlib import contextmanager
 from csv import DictReader
+from itertools import islice
 
-from django.core.management import BaseCommand
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, connections, transaction
 from reviews.models import (Categories, Comments, Genres, GenreTitle, Review,
-                            Title, User)
+                            Title, TitleFacet, User)
 
 DATA_DIR = 'static/data'
-DATA_PATCH = {
-    'users': os.path.join(DATA_DIR, 'users.csv'),
-    'category': os.path.join(DATA_DIR, 'category.csv'),
-    'genre': os.path.join(DATA_DIR, 'genre.csv'),
-    'titles': os.path.join(DATA_DIR, 'titles.csv'),
-    'genre_title': os.path.join(DATA_DIR, 'genre_title.csv'),
-    'review': os.path.join(DATA_DIR, 'review.csv'),
-    'comments': os.path.join(DATA_DIR, 'comments.csv'),
+BATCH_SIZE = 1000
+COPY_NULL = r'\N'
+LOAD_ERRORS = (DatabaseError, OSError, KeyError, ValueError, ValidationError)
+
+# Таблица: (CSV-файл, модель, {поле модели: колонка CSV}).
+TABLES = {
+    'users': ('users.csv', User, {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'role': 'role',
+        'bio': 'bio',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+    }),
+    'category': ('category.csv', Categories, {
+        'id': 'id',
+        'name': 'name',
+        'slug': 'slug',
+    }),
+    'genre': ('genre.csv', Genres, {
+        'id': 'id',
+        'name': 'name',
+        'slug': 'slug',
+    }),
+    'titles': ('titles.csv', Title, {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'category_id': 'category',
+    }),
+    'genre_title': ('genre_title.csv', GenreTitle, {
+        'id': 'id',
+        'title_id': 'title_id',
+        'genre_id': 'genre_id',
+    }),
+    'review': ('review.csv', Review, {
+        'id': 'id',
+        'title_id': 'title_id',
+        'text': 'text',
+        'author_id': 'author',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }),
+    'comments': ('comments.csv', Comments, {
+        'id': 'id',
+        'review_id': 'review_id',
+        'text': 'text',
+        'author_id': 'author',
+        'pub_date': 'pub_date',
+    }),
 }
 
 
-class Command(BaseCommand):
-    help = 'Loads data from api_yamdb/static/data/*.csv'
+def read_batches(path, model, columns, batch_size):
+    """Читает CSV порциями по batch_size объектов модели."""
+    with open(path, encoding='utf-8') as csv_file:
+        rows = DictReader(csv_file)
+        while True:
+            batch = [
+                model(**{
+                    field: row[column] for field, column in columns.items()
+                })
+                for row in islice(rows, batch_size)
+            ]
+            if not batch:
+                return
+            yield batch
 
-    def handle(self, *args, **options):
-        # Code to load the data into database
-        for row in DictReader(open(DATA_PATCH['users'])):
-            user = User(
-                id=row['id'],
-                username=row['username'],
-                email=row['email'],
-                role=row['role'],
-                bio=row['bio'],
-                first_name=row['first_name'],
-                last_name=row['last_name'],
-            )
-            user.save()
 
-        print('Loading data user')
+def copy_value(field, raw):
+    """Проверяет значение CSV и приводит его к текстовому виду для COPY."""
+    if raw == '' and field.null:
+        return COPY_NULL
+    value = field.get_db_prep_save(field.to_python(raw), connection)
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value)
 
-        for row in DictReader(open(DATA_PATCH['category'])):
-            category = Categories(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug'],
-            )
-            category.save()
 
-        print('Loading data category')
+def copy_lines(path, model, columns):
+    """Построчно превращает CSV в строки COPY по всем колонкам модели.
 
-        for row in DictReader(open(DATA_PATCH['genre'])):
-            genre = Genres(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug'],
-            )
-            genre.save()
+    Колонки, которых нет в файле, заполняются значениями по умолчанию,
+    так как COPY не знает о дефолтах, заданных в Django.
+    """
+    fields = model._meta.concrete_fields
+    defaults = {
+        field.attname: field.get_default()
+        for field in fields if field.attname not in columns
+    }
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    with open(path, encoding='utf-8') as csv_file:
+        for row in DictReader(csv_file):
+            writer.writerow([
+                copy_value(field, row[columns[field.attname]])
+                if field.attname in columns
+                else copy_value(field, defaults[field.attname])
+                for field in fields
+            ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
 
-        print('Loading data genre')
 
-        for row in DictReader(open(DATA_PATCH['titles'])):
-            title = Title(
-                id=row['id'],
-                name=row['name'],
-                year=row['year'],
-                category_id=row['category'],
-            )
-            title.save()
+class CopyStream:
+    """Файлоподобная обёртка над генератором строк для copy_expert.
 
-        print('Loading data title')
+    Держит в памяти не больше одного запрошенного блока данных.
+    """
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.buffer = ''
+        self.rows = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += next(self.lines)
+            except StopIteration:
+                break
+            self.rows += 1
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+def copy_table(path, model, columns):
+    """Загружает CSV через COPY FROM STDIN, возвращает число строк."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(
+        connection.ops.quote_name(field.column)
+        for field in model._meta.concrete_fields
+    )
+    sql = (
+        f"COPY {table} ({names}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+    stream = CopyStream(copy_lines(path, model, columns))
+    with connection.cursor() as cursor, connection.wrap_database_errors:
+        cursor.copy_expert(sql, stream)
+    return stream.rows
+
+
+@contextmanager
+def csv_dates(model, columns):
+    """Отключает auto_now_add у полей, значения которых берутся из CSV.
+
+    Иначе bulk_create подставит время вставки вместо даты из файла.
+    Флаг меняется у поля модели, общего для всего процесса, поэтому
+    в одном процессе таблицы загружаются по очереди (table_executor).
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.attname in columns
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def insert_batch(model, batch, batch_size):
+    """Вставляет пачку не больше, чем позволяет лимит параметров БД."""
+    limit = connection.ops.bulk_batch_size(model._meta.concrete_fields, batch)
+    model.objects.bulk_create(batch, batch_size=min(batch_size, limit))
+
+
+def load_table(table, data_dir, batch_size, use_copy=False):
+    """Загружает одну таблицу в одной транзакции, возвращает число строк."""
+    file_name, model, columns = TABLES[table]
+    path = os.path.join(data_dir, file_name)
+    with transaction.atomic():
+        if use_copy:
+            return copy_table(path, model, columns)
+        loaded = 0
+        with csv_dates(model, columns):
+            for batch in read_batches(path, model, columns, batch_size):
+                insert_batch(model, batch, batch_size)
+                loaded += len(batch)
+    return loaded
 
-        for row in DictReader(open(DATA_PATCH['genre_title'])):
-            genre_title = GenreTitle(
-                id=row['id'],
-                title_id=row['title_id'],
-                genre_id=row['genre_id'],
-            )
-            genre_title.save()
-
-        print('Loading data genre_title')
-
-        for row in DictReader(open(DATA_PATCH['review'])):
-            review = Review(
-                id=row['id'],
-                title_id=row['title_id'],
-                text=row['text'],
-                author_id=row['author'],
-                score=row['score'],
-                pub_date=row['pub_date'],
-            )
-            review.save()
 
-        print('Loading data review')
+def load_table_in_worker(table, data_dir, batch_size, use_copy):
+    """Загружает таблицу в процессе пула со своим соединением с БД."""
+    try:
+        started = time.monotonic()
+        loaded = load_table(table, data_dir, batch_size, use_copy)
+        return loaded, time.monotonic() - started
+    finally:
+        connections.close_all()
 
-        for row in DictReader(open(DATA_PATCH['comments'])):
-            comments = Comments(
-                id=row['id'],
-                review_id=row['review_id'],
-                text=row['text'],
-                author_id=row['author'],
-                pub_date=row['pub_date'],
+
+def dependency_graph(tables):
+    """Строит зависимости таблиц по внешним ключам их моделей."""
+    by_model = {TABLES[table][1]: table for table in tables}
+    graph = {}
+    for table in tables:
+        model = TABLES[table][1]
+        graph[table] = {
+            by_model[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.many_to_one
+            and field.related_model in by_model
+            and field.related_model is not model
+        }
+    return graph
+
+
+def table_executor(workers):
+    """Пул для загрузки таблиц.
+
+    Разбор CSV и сборка объектов упираются в GIL, поэтому независимые
+    таблицы загружаются в отдельных процессах. Процессы порождаются
+    через fork, так что открытые соединения родителя закрываются заранее:
+    каждый процесс открывает своё. С одним воркером таблицы загружаются
+    по очереди в потоке текущего процесса.
+    """
+    if workers <= 1:
+        return ThreadPoolExecutor(max_workers=1)
+    connections.close_all()
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('fork')
+    )
+
+
+def load_tables(tables, data_dir, batch_size, workers, report,
+                use_copy=False):
+    """Загружает таблицы в пуле, как только готовы их зависимости.
+
+    После первой ошибки новые таблицы не запускаются, уже начатые
+    дозагружаются. Возвращает множество загруженных таблиц и список ошибок.
+    """
+    graph = dependency_graph(tables)
+    loaded = set()
+    failures = []
+    pending = {}
+    with table_executor(workers) as executor:
+        while True:
+            started = set(pending.values()) | loaded
+            ready = [
+                table for table in tables
+                if table not in started and graph[table] <= loaded
+            ]
+            if not failures:
+                for table in ready:
+                    future = executor.submit(
+                        load_table_in_worker,
+                        table, data_dir, batch_size, use_copy,
+                    )
+                    pending[future] = table
+            if not pending:
+                return loaded, failures
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                table = pending.pop(future)
+                try:
+                    rows, elapsed = future.result()
+                except LOAD_ERRORS as error:
+                    failures.append(f'{table}: {error}')
+                    continue
+                loaded.add(table)
+                report(table, rows, elapsed)
+
+
+def reset_sequences(models):
+    """Сдвигает последовательности id после вставки с явными ключами."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+class Command(BaseCommand):
+    help = 'Loads data from CSV files into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir', default=DATA_DIR,
+            help='Directory with the CSV files',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Number of rows inserted per query',
+        )
+        parser.add_argument(
+            '--resume-from', choices=list(TABLES),
+            help=(
+                'Skip the tables before the given one '
+                'and the tables that already have rows'
+            ),
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of processes loading tables concurrently',
+        )
+        parser.add_argument(
+            '--copy', action='store_true',
+            help='Stream CSV files through PostgreSQL COPY FROM STDIN',
+        )
+
+    def handle(self, *args, **options):
+        tables = list(TABLES)
+        if options['resume_from']:
+            tables = [
+                table
+                for table in tables[tables.index(options['resume_from']):]
+                if not TABLES[table][1].objects.exists()
+            ]
+        workers = options['workers']
+        if connection.vendor == 'sqlite':
+            # SQLite всё равно допускает только одного писателя.
+            workers = 1
+        use_copy = options['copy']
+        if use_copy and connection.vendor != 'postgresql':
+            self.stderr.write(
+                'COPY is supported only on PostgreSQL, using bulk_create'
             )
-            comments.save()
+            use_copy = False
+
+        loaded, failures = load_tables(
+            tables, options['data_dir'], options['batch_size'], workers,
+            report=self.report, use_copy=use_copy,
+        )
+        if failures:
+            resume_table = next(
+                table for table in tables if table not in loaded
+            )
+            raise CommandError(
+                f'Loading failed: {"; ".join(failures)}. Fix the data and '
+                f'rerun with --resume-from {resume_table}'
+            )
+
+        reset_sequences([model for _, model, _ in TABLES.values()])
+        Title.rebuild_ratings()
+        TitleFacet.rebuild()
 
-        print('Loading data comments')
+    def report(self, table, rows, elapsed):
+        self.stdout.write(
+            f'Loading data {table}: {rows} rows, '
+            f'{rows / max(elapsed, 1e-6):.0f} rows/sec'
+        )
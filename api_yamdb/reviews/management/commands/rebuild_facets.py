@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+from reviews.models import TitleFacet
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds title facet counts from titles and their genres'
+
+    def handle(self, *args, **options):
+        rows = TitleFacet.rebuild()
+        self.stdout.write(f'Rebuilt {rows} facet counts')
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds title rating aggregates from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of titles updated per query',
+        )
+
+    def handle(self, *args, **options):
+        updated = Title.rebuild_ratings(batch_size=options['batch_size'])
+        self.stdout.write(f'Rebuilt ratings for {updated} titles')
@@ -0,0 +1,122 @@
+import random
+import uuid
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from reviews.models import (Categories, Comments, Genres, GenreTitle, Review,
+                            Title, TitleFacet, User)
+
+BATCH_SIZE = 1000
+
+
+def insert(model, objs, batch_size):
+    """bulk_create с учётом ограничения СУБД на число параметров."""
+    limit = connection.ops.bulk_batch_size(model._meta.concrete_fields, objs)
+    model.objects.bulk_create(objs, batch_size=max(min(batch_size, limit), 1))
+
+
+def seed_catalog(titles=100, reviews=10, comments=2, genres=10,
+                 categories=5, batch_size=BATCH_SIZE, seed=None):
+    """Создаёт синтетический каталог и возвращает число созданных строк.
+
+    Каждое произведение получает reviews отзывов от разных пользователей,
+    каждый отзыв — comments комментариев.
+    """
+    rng = random.Random(seed)
+    token = uuid.uuid4().hex[:8]
+    with transaction.atomic():
+        insert(User, [
+            User(username=f'seed-{token}-{number}',
+                 email=f'seed-{token}-{number}@yamdb.fake')
+            for number in range(max(reviews, 1))
+        ], batch_size)
+        users = list(
+            User.objects.filter(username__startswith=f'seed-{token}-')
+            .values_list('id', flat=True)
+        )
+        insert(Categories, [
+            Categories(name=f'Категория {number}',
+                       slug=f'{token}-category-{number}')
+            for number in range(categories)
+        ], batch_size)
+        category_ids = list(
+            Categories.objects.filter(slug__startswith=f'{token}-')
+            .values_list('id', flat=True)
+        )
+        insert(Genres, [
+            Genres(name=f'Жанр {number}', slug=f'{token}-genre-{number}')
+            for number in range(genres)
+        ], batch_size)
+        genre_ids = list(
+            Genres.objects.filter(slug__startswith=f'{token}-')
+            .values_list('id', flat=True)
+        )
+        insert(Title, [
+            Title(name=f'Произведение {token} {number}',
+                  year=rng.randint(1900, 2020),
+                  category_id=rng.choice(category_ids))
+            for number in range(titles)
+        ], batch_size)
+        title_ids = list(
+            Title.objects.filter(name__startswith=f'Произведение {token} ')
+            .values_list('id', flat=True)
+        )
+        insert(GenreTitle, [
+            GenreTitle(title_id=title_id, genre_id=genre_id)
+            for title_id in title_ids
+            for genre_id in rng.sample(genre_ids, min(2, len(genre_ids)))
+        ], batch_size)
+        insert(Review, [
+            Review(title_id=title_id, author_id=author_id,
+                   text=f'Отзыв {token}', score=rng.randint(1, 10))
+            for title_id in title_ids
+            for author_id in users[:reviews]
+        ], batch_size)
+        review_ids = list(
+            Review.objects.filter(text=f'Отзыв {token}')
+            .values_list('id', flat=True)
+        )
+        insert(Comments, [
+            Comments(review_id=review_id, author_id=rng.choice(users),
+                     text=f'Комментарий {number}')
+            for review_id in review_ids
+            for number in range(comments)
+        ], batch_size)
+    Title.rebuild_ratings()
+    TitleFacet.rebuild()
+    return {
+        'users': len(users),
+        'titles': len(title_ids),
+        'reviews': len(review_ids),
+        'comments': len(review_ids) * comments,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Seeds a synthetic catalog for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=100)
+        parser.add_argument(
+            '--reviews', type=int, default=10, help='Reviews per title'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=2, help='Comments per review'
+        )
+        parser.add_argument('--genres', type=int, default=10)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--seed', type=int, help='Random seed')
+
+    def handle(self, *args, **options):
+        created = seed_catalog(
+            titles=options['titles'],
+            reviews=options['reviews'],
+            comments=options['comments'],
+            genres=options['genres'],
+            categories=options['categories'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+        )
+        for table, rows in created.items():
+            self.stdout.write(f'Seeded {table}: {rows} rows')
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# icontains на PostgreSQL превращается в UPPER(name) LIKE UPPER('%...%'),
+# поэтому триграммный индекс строится по тому же выражению.
+CREATE_TRGM_INDEX = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm;'
+    'CREATE INDEX title_name_trgm_idx '
+    'ON reviews_title USING gin (UPPER(name) gin_trgm_ops);'
+)
+DROP_TRGM_INDEX = 'DROP INDEX IF EXISTS title_name_trgm_idx;'
+
+
+def create_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRGM_INDEX)
+
+
+def drop_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRGM_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_index, drop_trgm_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_name_trgm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'year'], name='title_name_year_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:16
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_facets(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    TitleFacet = apps.get_model('reviews', 'TitleFacet')
+    stats = {
+        'genre': GenreTitle.objects.exclude(genre=None)
+        .values_list('genre_id').annotate(count=Count('title_id')),
+        'category': Title.objects.exclude(category=None)
+        .values_list('category_id').annotate(count=Count('id')),
+        'year': Title.objects.values_list('year')
+        .annotate(count=Count('id')),
+    }
+    TitleFacet.objects.bulk_create(
+        TitleFacet(facet=facet, value=value, count=count)
+        for facet, rows in stats.items()
+        for value, count in rows.order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_name_year_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleFacet',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('genre', 'Жанр'), ('category', 'Категория'), ('year', 'Год')], max_length=16)),
+                ('value', models.IntegerField()),
+                ('count', models.IntegerField(default=0, verbose_name='Количество произведений')),
+            ],
+            options={
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(fill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_facets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('top', 'Лучшие по оценке'), ('trending', 'Больше всего отзывов за последние дни')], max_length=16)),
+                ('scope', models.CharField(blank=True, max_length=32)),
+                ('position', models.PositiveIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Рейтинг или число отзывов')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Время пересчёта')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Title')),
+            ],
+            options={
+                'ordering': ('board', 'scope', 'position'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['board', 'scope', 'position'], name='ranking_board_scope_idx'),
+        ),
+    ]
@@ -1,7 +1,13 @@
 import datetime
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import reduce
+from operator import or_
 
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
 from users.models import User
 
 
@@ -48,15 +54,197 @@ class Title(models.Model):
         through='GenreTitle'
     )
     description = models.TextField(max_length=200, blank=True, null=True)
+    review_count = models.PositiveIntegerField('Количество отзывов', default=0)
+    score_sum = models.PositiveIntegerField('Сумма оценок', default=0)
+    rating = models.FloatField('Рейтинг', null=True, blank=True)
 
     class Meta:
         ordering = ('pk',)
+        indexes = [
+            models.Index(
+                fields=['category', 'id'], name='title_category_id_idx'
+            ),
+            models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+            models.Index(
+                fields=['name', 'year'], name='title_name_year_idx'
+            ),
+        ]
+
+    @staticmethod
+    def calculate_rating(review_count, score_sum):
+        if not review_count:
+            return None
+        return score_sum / review_count
+
+    @classmethod
+    def update_rating(cls, title_id, count_delta=0, score_delta=0):
+        """Сдвигает агрегаты рейтинга произведения на заданные величины."""
+        with transaction.atomic():
+            title = cls.objects.select_for_update().only(
+                'review_count', 'score_sum'
+            ).get(pk=title_id)
+            title.review_count += count_delta
+            title.score_sum += score_delta
+            title.rating = cls.calculate_rating(
+                title.review_count, title.score_sum
+            )
+            title.save(update_fields=['review_count', 'score_sum', 'rating'])
+
+    @classmethod
+    def rebuild_ratings(cls, batch_size=500):
+        """Пересчитывает агрегаты рейтинга всех произведений по отзывам."""
+        stats = Review.objects.order_by().values('title_id').annotate(
+            count=Count('id'), total=Sum('score')
+        )
+        titles = [
+            cls(
+                pk=row['title_id'],
+                review_count=row['count'],
+                score_sum=row['total'],
+                rating=cls.calculate_rating(row['count'], row['total']),
+            )
+            for row in stats
+        ]
+        with transaction.atomic():
+            cls.objects.update(review_count=0, score_sum=0, rating=None)
+            cls.objects.bulk_update(
+                titles,
+                ['review_count', 'score_sum', 'rating'],
+                batch_size=batch_size,
+            )
+        return len(titles)
 
 
 class GenreTitle(models.Model):
     genre = models.ForeignKey(Genres, on_delete=models.SET_NULL, null=True)
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='genretitle_genre_title_idx'
+            ),
+        ]
+
+
+facet_batch = threading.local()
+
+
+class TitleFacet(models.Model):
+    """Число произведений по жанру, категории и году.
+
+    Счётчики сдвигаются при изменении произведений и их жанров (см.
+    api/signals.py), поэтому фасеты каталога без фильтров читаются одним
+    запросом вместо GROUP BY по всем произведениям.
+    """
+    GENRE = 'genre'
+    CATEGORY = 'category'
+    YEAR = 'year'
+    FACETS = (
+        (GENRE, 'Жанр'),
+        (CATEGORY, 'Категория'),
+        (YEAR, 'Год'),
+    )
+
+    facet = models.CharField(max_length=16, choices=FACETS)
+    # id жанра, id категории или год.
+    value = models.IntegerField()
+    count = models.IntegerField('Количество произведений', default=0)
+
+    class Meta:
+        unique_together = ['facet', 'value']
+
+    @classmethod
+    def title_deltas(cls, added=(), removed=()):
+        """Сдвиги счётчиков по парам (id категории, год) произведений."""
+        deltas = Counter()
+        for pairs, sign in ((added, 1), (removed, -1)):
+            for category_id, year in pairs:
+                deltas[cls.CATEGORY, category_id] += sign
+                deltas[cls.YEAR, year] += sign
+        return deltas
+
+    @classmethod
+    @contextmanager
+    def deferred(cls):
+        """Применяет сдвиги счётчиков блока одной парой запросов."""
+        if getattr(facet_batch, 'deltas', None) is not None:
+            yield
+            return
+        facet_batch.deltas = Counter()
+        try:
+            yield
+            deltas = facet_batch.deltas
+        finally:
+            facet_batch.deltas = None
+        cls.adjust(deltas)
+
+    @classmethod
+    def adjust(cls, deltas):
+        """Сдвигает счётчики на {(фасет, значение): изменение}.
+
+        Недостающие счётчики вставляются одним запросом, сдвиг всех
+        значений выполняется одним UPDATE. Внутри deferred() сдвиги
+        копятся до конца блока.
+        """
+        if getattr(facet_batch, 'deltas', None) is not None:
+            facet_batch.deltas.update(deltas)
+            return
+        deltas = {
+            key: delta for key, delta in deltas.items()
+            if key[1] is not None and delta
+        }
+        if not deltas:
+            return
+        cls.objects.bulk_create(
+            [cls(facet=facet, value=value, count=0)
+             for facet, value in sorted(deltas)],
+            ignore_conflicts=True,
+        )
+        values = defaultdict(list)
+        for facet, value in deltas:
+            values[facet].append(value)
+        cls.objects.filter(reduce(or_, (
+            Q(facet=facet, value__in=facet_values)
+            for facet, facet_values in values.items()
+        ))).update(count=F('count') + Case(
+            *(When(facet=facet, value=value, then=Value(delta))
+              for (facet, value), delta in deltas.items()),
+            default=Value(0),
+            output_field=models.IntegerField(),
+        ))
+
+    @classmethod
+    def counts(cls, facets):
+        """Ненулевые счётчики: {фасет: {значение: число}}."""
+        result = {facet: {} for facet in facets}
+        for facet, value, count in cls.objects.filter(
+            facet__in=facets, count__gt=0
+        ).values_list('facet', 'value', 'count'):
+            result[facet][value] = count
+        return result
+
+    @classmethod
+    def rebuild(cls):
+        """Пересчитывает все счётчики по произведениям и их жанрам."""
+        stats = {
+            cls.GENRE: GenreTitle.objects.exclude(genre=None)
+            .values_list('genre_id').annotate(count=Count('title_id')),
+            cls.CATEGORY: Title.objects.exclude(category=None)
+            .values_list('category_id').annotate(count=Count('id')),
+            cls.YEAR: Title.objects.values_list('year')
+            .annotate(count=Count('id')),
+        }
+        facets = [
+            cls(facet=facet, value=value, count=count)
+            for facet, rows in stats.items()
+            for value, count in rows.order_by()
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(facets)
+        return len(facets)
+
 
 class Review(models.Model):
     author = models.ForeignKey(
@@ -80,6 +268,13 @@ class Review(models.Model):
     class Meta:
         unique_together = ['title', 'author']
         ordering = ('pk',)
+        indexes = [
+            models.Index(fields=['title', 'id'], name='review_title_id_idx'),
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
 
 
 class Comments(models.Model):
@@ -98,3 +293,104 @@ class Comments(models.Model):
 
     class Meta:
         ordering = ('pk',)
+        indexes = [
+            models.Index(
+                fields=['review', 'id'], name='comment_review_id_idx'
+            ),
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
+
+
+class TitleRanking(models.Model):
+    """Первые места рейтингов произведений.
+
+    Рейтинги пересобираются по расписанию (см. refresh), поэтому
+    эндпоинты читают готовые места, а не сортируют весь каталог.
+    """
+    TOP = 'top'
+    TRENDING = 'trending'
+    BOARDS = (
+        (TOP, 'Лучшие по оценке'),
+        (TRENDING, 'Больше всего отзывов за последние дни'),
+    )
+
+    board = models.CharField(max_length=16, choices=BOARDS)
+    # '' — весь каталог, иначе 'genre:<id>' или 'category:<id>'.
+    scope = models.CharField(max_length=32, blank=True)
+    position = models.PositiveIntegerField('Место')
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='rankings'
+    )
+    score = models.FloatField('Рейтинг или число отзывов')
+    refreshed_at = models.DateTimeField('Время пересчёта')
+
+    class Meta:
+        ordering = ('board', 'scope', 'position')
+        indexes = [
+            models.Index(
+                fields=['board', 'scope', 'position'],
+                name='ranking_board_scope_idx',
+            ),
+        ]
+
+    @staticmethod
+    def scopes():
+        """Пары (scope, фильтр по произведению) всех рейтингов."""
+        scopes = [('', {})]
+        scopes += [
+            (f'genre:{pk}', {'genre': pk})
+            for pk in Genres.objects.values_list('pk', flat=True)
+        ]
+        scopes += [
+            (f'category:{pk}', {'category': pk})
+            for pk in Categories.objects.values_list('pk', flat=True)
+        ]
+        return scopes
+
+    @staticmethod
+    def top_titles(filters, size):
+        return Title.objects.filter(
+            rating__isnull=False, **filters
+        ).order_by('-rating', '-review_count', 'pk').values_list(
+            'pk', 'rating'
+        )[:size]
+
+    @staticmethod
+    def trending_titles(filters, size, since):
+        return Review.objects.filter(
+            pub_date__gte=since,
+            **{f'title__{name}': value for name, value in filters.items()}
+        ).values_list('title_id').annotate(
+            recent=Count('id')
+        ).order_by('-recent', 'title_id')[:size]
+
+    @classmethod
+    def refresh(cls, size, days, now):
+        """Пересобирает первые size мест всех рейтингов.
+
+        Для каждого рейтинга выполняется один запрос с сортировкой и
+        LIMIT. Старые места заменяются в одной транзакции, так что
+        читатели видят либо прежний, либо новый рейтинг целиком.
+        """
+        since = now - datetime.timedelta(days=days)
+        places = []
+        for scope, filters in cls.scopes():
+            boards = (
+                (cls.TOP, cls.top_titles(filters, size)),
+                (cls.TRENDING, cls.trending_titles(filters, size, since)),
+            )
+            for board, ranked in boards:
+                places += [
+                    cls(board=board, scope=scope, position=position,
+                        title_id=title_id, score=score, refreshed_at=now)
+                    for position, (title_id, score) in enumerate(
+                        ranked, start=1
+                    )
+                ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(places)
+        return len(places)
@@ -0,0 +1,177 @@
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from reviews.models import Comments, Review, Title
+
+from .models import SearchDocument, SearchTerm
+
+# Веса заголовка и текста, как у весов A и B в ts_rank.
+HEADING_WEIGHT = 1.0
+BODY_WEIGHT = 0.4
+TERM_LENGTH = SearchTerm._meta.get_field('term').max_length
+BATCH_SIZE = 500
+KINDS = {
+    Title: SearchDocument.TITLE,
+    Review: SearchDocument.REVIEW,
+    Comments: SearchDocument.COMMENT,
+}
+
+
+def use_full_text():
+    return connection.vendor == 'postgresql'
+
+
+def tokenize(text):
+    return [
+        token[:TERM_LENGTH] for token in re.findall(r'\w+', text.lower())
+    ]
+
+
+def search_vector():
+    config = settings.SEARCH_CONFIG
+    return (
+        SearchVector('heading', weight='A', config=config)
+        + SearchVector('body', weight='B', config=config)
+    )
+
+
+def document_for(instance):
+    """Поля поискового документа для произведения, отзыва или комментария."""
+    if isinstance(instance, Title):
+        return {
+            'kind': SearchDocument.TITLE,
+            'title_id': instance.pk,
+            'review_id': None,
+            'heading': instance.name,
+            'body': instance.description or '',
+        }
+    if isinstance(instance, Review):
+        return {
+            'kind': SearchDocument.REVIEW,
+            'title_id': instance.title_id,
+            'review_id': instance.pk,
+            'heading': '',
+            'body': instance.text,
+        }
+    return {
+        'kind': SearchDocument.COMMENT,
+        'title_id': instance.review.title_id,
+        'review_id': instance.review_id,
+        'heading': '',
+        'body': instance.text,
+    }
+
+
+def document_terms(document):
+    weights = Counter()
+    for token in tokenize(document.heading):
+        weights[token] += HEADING_WEIGHT
+    for token in tokenize(document.body):
+        weights[token] += BODY_WEIGHT
+    return [
+        SearchTerm(document=document, term=term, weight=weight)
+        for term, weight in weights.items()
+    ]
+
+
+@transaction.atomic
+def index_object(instance):
+    """Обновляет поисковый документ одного объекта."""
+    fields = document_for(instance)
+    document, _ = SearchDocument.objects.update_or_create(
+        kind=fields.pop('kind'), object_id=instance.pk, defaults=fields
+    )
+    if use_full_text():
+        SearchDocument.objects.filter(pk=document.pk).update(
+            vector=search_vector()
+        )
+        return
+    document.terms.all().delete()
+    SearchTerm.objects.bulk_create(document_terms(document))
+
+
+def index_objects(instances, created=False):
+    """Обновляет поисковые документы пачки объектов одного типа.
+
+    Для объектов, созданных через bulk_create (created=True), старых
+    документов нет, и удаление пропускается.
+    """
+    if not instances:
+        return
+    kind = KINDS[type(instances[0])]
+    ids = [instance.pk for instance in instances]
+    if not created:
+        SearchDocument.objects.filter(kind=kind, object_id__in=ids).delete()
+    save_documents([
+        SearchDocument(object_id=instance.pk, **document_for(instance))
+        for instance in instances
+    ])
+    if use_full_text():
+        SearchDocument.objects.filter(
+            kind=kind, object_id__in=ids
+        ).update(vector=search_vector())
+
+
+def remove_object(instance):
+    kind = KINDS[type(instance)]
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+@transaction.atomic
+def rebuild_index(batch_size=BATCH_SIZE):
+    """Строит поисковый индекс заново, возвращает число документов."""
+    SearchDocument.objects.all().delete()
+    querysets = (
+        Title.objects.all(),
+        Review.objects.all(),
+        Comments.objects.select_related('review'),
+    )
+    total = 0
+    for queryset in querysets:
+        batch = []
+        for instance in queryset.iterator(chunk_size=batch_size):
+            fields = document_for(instance)
+            batch.append(SearchDocument(object_id=instance.pk, **fields))
+            if len(batch) >= batch_size:
+                total += save_documents(batch)
+                batch = []
+        total += save_documents(batch)
+    if use_full_text():
+        SearchDocument.objects.update(vector=search_vector())
+    return total
+
+
+def save_documents(documents):
+    SearchDocument.objects.bulk_create(documents)
+    if not use_full_text() and documents:
+        # SQLite не возвращает id из bulk_create.
+        saved = SearchDocument.objects.filter(
+            kind=documents[0].kind,
+            object_id__in=[document.object_id for document in documents],
+        )
+        SearchTerm.objects.bulk_create(
+            [term for document in saved for term in document_terms(document)]
+        )
+    return len(documents)
+
+
+def search(query, kind=None):
+    """Документы, подходящие под запрос, по убыванию релевантности."""
+    documents = SearchDocument.objects.all()
+    if kind:
+        documents = documents.filter(kind=kind)
+    if use_full_text():
+        search_query = SearchQuery(query, config=settings.SEARCH_CONFIG)
+        documents = documents.filter(vector=search_query).annotate(
+            rank=SearchRank(F('vector'), search_query)
+        )
+    else:
+        documents = documents.filter(
+            terms__term__in=tokenize(query)
+        ).annotate(rank=Sum('terms__weight'))
+    return documents.order_by('-rank', 'pk')
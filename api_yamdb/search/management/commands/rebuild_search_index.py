@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+from search.indexing import BATCH_SIZE, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the search index for titles, reviews and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Number of documents inserted per query',
+        )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(f'Indexed {indexed} documents')
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+CREATE_GIN_INDEX = (
+    'CREATE INDEX search_document_vector_idx '
+    'ON search_searchdocument USING gin (vector);'
+)
+DROP_GIN_INDEX = 'DROP INDEX IF EXISTS search_document_vector_idx;'
+
+
+def create_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_GIN_INDEX)
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_GIN_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,40 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """Поисковый документ произведения, отзыва или комментария."""
+    TITLE = 'title'
+    REVIEW = 'review'
+    COMMENT = 'comment'
+    KINDS = [
+        (TITLE, 'Произведение'),
+        (REVIEW, 'Отзыв'),
+        (COMMENT, 'Комментарий'),
+    ]
+    kind = models.CharField('Тип', max_length=16, choices=KINDS)
+    object_id = models.PositiveIntegerField('Id объекта')
+    title_id = models.PositiveIntegerField('Id произведения')
+    review_id = models.PositiveIntegerField('Id отзыва', null=True)
+    heading = models.TextField('Заголовок', blank=True)
+    body = models.TextField('Текст', blank=True)
+    # Заполняется только на PostgreSQL, индекс GIN создаётся миграцией.
+    vector = SearchVectorField(null=True)
+
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        ordering = ('pk',)
+
+
+class SearchTerm(models.Model):
+    """Запись инвертированного индекса для СУБД без полнотекстового поиска."""
+    document = models.ForeignKey(
+        SearchDocument, on_delete=models.CASCADE, related_name='terms'
+    )
+    term = models.CharField('Терм', max_length=64)
+    weight = models.FloatField('Вес')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'document'], name='search_term_idx'),
+        ]
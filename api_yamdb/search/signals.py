@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Comments, Review, Title
+
+from .indexing import index_object, remove_object
+
+INDEXED_FIELDS = {'name', 'description', 'text'}
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comments)
+def object_saved(sender, instance, update_fields=None, **kwargs):
+    # Пересчёт рейтинга и другие частичные сохранения текст не меняют.
+    if update_fields and not INDEXED_FIELDS & set(update_fields):
+        return
+    index_object(instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comments)
+def object_deleted(sender, instance, **kwargs):
+    remove_object(instance)
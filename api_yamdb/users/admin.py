@@ -1,4 +1,5 @@
 from django.contrib import admin
-from users.models import User
+from users.models import OutgoingMail, User
 
 admin.site.register(User)
+admin.site.register(OutgoingMail)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingMail
+
+
+def enqueue_mail(subject, body, from_email, recipient):
+    """Ставит письмо в очередь вместо отправки внутри запроса."""
+    return OutgoingMail.objects.create(
+        subject=subject, body=body, from_email=from_email, recipient=recipient
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(
+        seconds=settings.MAIL_RETRY_BACKOFF * 2 ** (attempts - 1)
+    )
+
+
+def claim_batch(batch_size, max_attempts):
+    """Забирает письма, готовые к отправке, откладывая их на время попытки.
+
+    Блокировка держится только до конца выборки, поэтому параллельный
+    обработчик не получит те же письма, а письмо, на котором процесс
+    упал, вернётся в очередь через retry_delay.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutgoingMail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                attempts__lt=max_attempts,
+                send_after__lte=now,
+            ).order_by('send_after', 'pk')[:batch_size]
+        )
+        OutgoingMail.objects.filter(pk__in=[mail.pk for mail in batch]).update(
+            send_after=now + retry_delay(1)
+        )
+    return batch
+
+
+def mark_sent(mail):
+    OutgoingMail.objects.filter(pk=mail.pk).update(
+        attempts=mail.attempts + 1, sent_at=timezone.now(), last_error=''
+    )
+
+
+def mark_failed(mail, error):
+    attempts = mail.attempts + 1
+    OutgoingMail.objects.filter(pk=mail.pk).update(
+        attempts=attempts,
+        last_error=str(error) or type(error).__name__,
+        send_after=timezone.now() + retry_delay(attempts),
+    )
+
+
+def deliver_batch(batch_size, max_attempts):
+    """Отправляет пачку писем через одно соединение.
+
+    Возвращает число отправленных и неотправленных писем. Результат
+    каждого письма сохраняется сразу после попытки, поэтому ошибка
+    одного письма не откатывает и не повторяет уже отправленные.
+    Неотправленные письма откладываются с экспоненциальной задержкой.
+    """
+    batch = claim_batch(batch_size, max_attempts)
+    if not batch:
+        return 0, 0
+
+    sent = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for mail in batch:
+            mark_failed(mail, error)
+        return 0, len(batch)
+    try:
+        for mail in batch:
+            message = EmailMessage(
+                mail.subject, mail.body, mail.from_email, [mail.recipient],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                mark_failed(mail, error)
+                continue
+            mark_sent(mail)
+            sent += 1
+    finally:
+        connection.close()
+    return sent, len(batch) - sent
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from users.mailer import deliver_batch
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued e-mails in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of e-mails sent over one connection',
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=settings.MAIL_MAX_ATTEMPTS,
+            help='Stop retrying an e-mail after this many failures',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to wait between polls of an empty queue',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_batch(
+                options['batch_size'], options['max_attempts']
+            )
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} e-mails, {failed} failed')
+                continue
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
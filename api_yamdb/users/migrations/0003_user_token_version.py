@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_outgoing_mail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Токены с другой версией отклоняются', verbose_name='Версия токенов'),
+        ),
+    ]
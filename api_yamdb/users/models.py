@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -21,6 +22,11 @@ class User(AbstractUser):
         choices=USERROLES,
         default=USER
     )
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        help_text='Токены с другой версией отклоняются',
+    )
 
     @property
     def is_admin(self):
@@ -32,3 +38,25 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ('pk',)
+
+
+class OutgoingMail(models.Model):
+    """Письмо в очереди на отправку обработчиком deliver_mail."""
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    recipient = models.EmailField('Получатель')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    send_after = models.DateTimeField('Отправить после', default=timezone.now)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('pk',)
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'send_after'],
+                name='outgoing_mail_queue_idx',
+            ),
+        ]
@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Categories
+    return Categories.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genres
+    return [
+        Genres.objects.create(name='Драма', slug='drama'),
+        Genres.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(name='Чудо', year=1999, category=category)
+    title.genre.set(genres)
+    return title
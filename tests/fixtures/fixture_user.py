@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake',
+        password='1234567', role='admin', bio='admin bio'
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake',
+        password='1234567', role='user', bio='user bio'
+    )
+
+
+@pytest.fixture
+def token_admin(admin):
+    from rest_framework_simplejwt.tokens import RefreshToken
+    token = RefreshToken.for_user(admin)
+    return {
+        'refresh': str(token),
+        'access': str(token.access_token),
+    }
+
+
+@pytest.fixture
+def token_user(user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+    token = RefreshToken.for_user(user)
+    return {
+        'refresh': str(token),
+        'access': str(token.access_token),
+    }
+
+
+@pytest.fixture
+def admin_client(token_admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_admin["access"]}')
+    return client
+
+
+@pytest.fixture
+def user_client(token_user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}')
+    return client
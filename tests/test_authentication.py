@@ -0,0 +1,126 @@
+import pytest
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def issue_token(client, user):
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': PasswordResetTokenGenerator().make_token(user),
+    })
+    assert response.status_code == 200
+    token_client = APIClient()
+    token_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+    )
+    return token_client
+
+
+class TestStatelessJWT:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_single_column_user_check(self, client, admin):
+        admin_client = issue_token(client, admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+            )
+        assert response.status_code == 201, (
+            'Проверьте, что роль администратора берётся из токена'
+        )
+        user_queries = [
+            query['sql'] for query in queries if 'users_user' in query['sql']
+        ]
+        assert len(user_queries) == 1
+        assert '"password"' not in user_queries[0], (
+            'Проверьте, что пользователь не читается из БД целиком'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                '/api/v1/genres/', data={'name': 'Комедия', 'slug': 'comedy'}
+            )
+        assert response.status_code == 201
+        assert not any('users_user' in query['sql'] for query in queries), (
+            'Проверьте, что is_active и token_version берутся из кеша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_role_change_revokes_tokens(self, client, admin_client, user):
+        user_client = issue_token(client, user)
+        data = {'name': 'Драма', 'slug': 'drama'}
+        assert user_client.post('/api/v1/genres/', data=data).status_code == 403
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.post('/api/v1/genres/', data=data).status_code == 401, (
+            'Проверьте, что смена роли отзывает уже выданные токены'
+        )
+        user.refresh_from_db()
+        assert issue_token(client, user).post(
+            '/api/v1/genres/', data=data
+        ).status_code == 201
+
+    @pytest.mark.django_db(transaction=True)
+    def test_demotion_survives_cache_loss(self, client, admin_client):
+        from django.core.cache import cache
+        from users.models import User
+
+        other = User.objects.create(
+            username='other_admin', email='other@yamdb.fake', role='admin'
+        )
+        other_client = issue_token(client, other)
+        data = {'name': 'Драма', 'slug': 'drama'}
+        response = admin_client.patch(
+            f'/api/v1/users/{other.username}/', data={'role': 'user'}
+        )
+        assert response.status_code == 200
+        # Вытеснение и чужой воркер: отзыв не должен зависеть от кеша.
+        for number in range(400):
+            cache.set(f'filler:{number}', number)
+        cache.clear()
+
+        assert other_client.post(
+            '/api/v1/genres/', data=data
+        ).status_code == 401, (
+            'Проверьте, что отзыв токенов хранится в БД, а не в кеше'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_profile_edit_keeps_tokens(self, client, admin_client, user):
+        user_client = issue_token(client, user)
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'bio': 'Новое'}
+        )
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_deleted_user_rejected(self, client, admin_client, user):
+        user_client = issue_token(client, user)
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    @pytest.mark.django_db(transaction=True)
+    def test_author_permissions(self, client, user, admin, title):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=admin, text='Чужой', score=5
+        )
+        user_client = issue_token(client, user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert user_client.patch(
+            f'{url}{review.id}/', data={'text': 'Правка'}
+        ).status_code == 403
+        response = user_client.post(url, data={'text': 'Свой', 'score': 6})
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        assert user_client.patch(
+            f'{url}{response.json()["id"]}/', data={'text': 'Правка'}
+        ).status_code == 200
@@ -0,0 +1,82 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class TestBenchmarks:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_seed_catalog(self):
+        from reviews.management.commands.seed_catalog import seed_catalog
+        from reviews.models import Comments, Review, Title
+
+        created = seed_catalog(titles=4, reviews=3, comments=2, seed=1)
+
+        assert created == {
+            'users': 3, 'titles': 4, 'reviews': 12, 'comments': 24
+        }
+        assert Review.objects.count() == 12
+        assert Comments.objects.count() == 24
+        assert not Title.objects.filter(review_count=0).exists(), (
+            'Проверьте, что seed_catalog пересчитывает рейтинг'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_benchmark_indexes(self):
+        from reviews.management.commands.seed_catalog import seed_catalog
+
+        seed_catalog(titles=4, reviews=3, comments=1, seed=1)
+        out = StringIO()
+        call_command('benchmark_indexes', repeat=1, json=True, stdout=out)
+
+        report = json.loads(out.getvalue())
+        assert 'reviews_by_title' in report
+        plan_before, _ = report['reviews_cursor_page']['before']
+        plan_after, _ = report['reviews_cursor_page']['after']
+        assert 'review_title_pub_date_idx' not in plan_before
+        assert 'review_title_pub_date_idx' in plan_after
+
+    @pytest.mark.django_db(transaction=True)
+    def test_benchmark_api(self):
+        from reviews.models import Review
+
+        out = StringIO()
+        call_command(
+            'benchmark_api', titles=3, reviews=2, comments=1, repeat=3,
+            seed=1, json=True, stdout=out,
+        )
+
+        report = json.loads(out.getvalue())
+        assert report['catalog']['reviews'] == 6
+        endpoints = report['endpoints']
+        for name in ('titles-list', 'reviews-cursor', 'comments-create',
+                     'search', 'users-me', 'auth-signup'):
+            assert name in endpoints, f'Проверьте, что замеряется {name}'
+        for name, result in endpoints.items():
+            assert result['errors'] == 0, (
+                f'{name}: запрос вернул {result["status"]}'
+            )
+            assert result['requests'] == 3
+            assert result['p50'] <= result['p95'] <= result['p99']
+            assert result['queries'] >= 0
+        assert Review.objects.count() == 6, (
+            'Проверьте, что изменяющие запросы откатываются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_benchmark_serializers(self):
+        out = StringIO()
+        call_command(
+            'benchmark_serializers', items=5, repeat=2, seed=1, json=True,
+            stdout=out,
+        )
+
+        report = json.loads(out.getvalue())
+        assert set(report) == {'titles', 'reviews', 'comments'}
+        for name, result in report.items():
+            assert result['items'] == 5
+            assert result['identical'], (
+                f'{name}: компактная сериализация отличается от DRF'
+            )
@@ -0,0 +1,128 @@
+import pytest
+
+from .utils import assert_max_queries
+
+URL = '/api/v1/reviews/bulk/'
+
+
+class TestBulkReviews:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_per_item_results(self, admin_client, admin, user, title,
+                              category):
+        from reviews.models import Review, Title
+
+        other = Title.objects.create(name='Другое', year=2000,
+                                     category=category)
+        Review.objects.create(title=title, author=user, text='Был', score=2)
+        Title.rebuild_ratings()
+
+        response = admin_client.post(URL, data=[
+            {'title': title.id, 'text': 'Первый', 'score': 10},
+            {'title': other.id, 'text': 'Второй', 'score': 6},
+            {'title': other.id, 'text': 'Повтор', 'score': 1},
+            {'title': other.id, 'text': 'Оценка', 'score': 11},
+            {'title': 999, 'text': 'Нет', 'score': 5},
+            {'title': title.id, 'text': 'Чужой', 'score': 3,
+             'author': user.username},
+            {'title': other.id, 'text': 'От имени', 'score': 4,
+             'author': user.username},
+        ], format='json')
+
+        assert response.status_code == 207
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            201, 201, 400, 400, 400, 400, 201
+        ], 'Проверьте результаты по каждому отзыву'
+        assert results[0]['review']['author'] == admin.username
+        assert results[6]['review']['author'] == user.username
+        assert 'non_field_errors' in results[2]['errors']
+        assert 'score' in results[3]['errors']
+        assert 'title' in results[4]['errors']
+        assert Review.objects.count() == 4
+        assert Review.objects.get(
+            pk=results[1]['review']['id']
+        ).text == 'Второй'
+
+        title.refresh_from_db()
+        other.refresh_from_db()
+        assert title.rating == 6
+        assert (other.review_count, other.rating) == (2, 5)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_query_count_independent_of_size(self, admin_client, title,
+                                             category):
+        from reviews.models import Title
+
+        titles = [title] + [
+            Title.objects.create(name=f'П{number}', year=2000,
+                                 category=category)
+            for number in range(9)
+        ]
+        data = [
+            {'title': item.id, 'text': 'Текст', 'score': 7}
+            for item in titles
+        ]
+        # Аутентификация не ходит в БД; пачка — блокировка, авторы,
+        # дубликаты, вставка, id на SQLite, индекс поиска, рейтинг —
+        # savepoint, блокировка, обновление на каждое произведение.
+        response = assert_max_queries(
+            admin_client, URL, 10 + 4 * len(titles), method='post',
+            data=data, format='json',
+        )
+        assert response.status_code == 201
+
+    @pytest.mark.django_db(transaction=True)
+    def test_author_only_for_admin(self, user_client, admin, title):
+        response = user_client.post(URL, data=[
+            {'title': title.id, 'text': 'Текст', 'score': 7,
+             'author': admin.username},
+        ], format='json')
+
+        assert response.status_code == 400
+        assert 'author' in response.json()['results'][0]['errors']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_requires_list(self, user_client, client):
+        assert user_client.post(URL, data={}, format='json').status_code == 400
+        assert client.post(
+            URL, data='[]', content_type='application/json'
+        ).status_code == 401
+
+    @pytest.mark.django_db(transaction=True)
+    def test_staff_sets_author(self, django_user_model, user, title):
+        from rest_framework.test import APIClient
+
+        staff = django_user_model.objects.create(
+            username='staff', email='staff@yamdb.fake', is_staff=True
+        )
+        client = APIClient()
+        client.force_authenticate(staff)
+        response = client.post(URL, data=[
+            {'title': title.id, 'text': 'Текст', 'score': 7,
+             'author': user.username},
+        ], format='json')
+
+        assert response.status_code == 201, (
+            'Проверьте, что автора задаёт тот же администратор, что и в IsAdmin'
+        )
+        assert response.json()['results'][0]['review']['author'] == (
+            user.username
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_deleted_requester(self, django_user_model, title):
+        from rest_framework.test import APIClient
+
+        reader = django_user_model.objects.create(
+            username='reader', email='reader@yamdb.fake'
+        )
+        client = APIClient()
+        client.force_authenticate(reader)
+        django_user_model.objects.filter(pk=reader.pk).delete()
+
+        response = client.post(URL, data=[
+            {'title': title.id, 'text': 'Текст', 'score': 7},
+        ], format='json')
+
+        assert response.status_code == 401
@@ -0,0 +1,140 @@
+import pytest
+
+from .utils import assert_max_queries
+
+URL = '/api/v1/titles/bulk/'
+
+
+class TestBulkTitles:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_upsert(self, admin_client, category, genres, title):
+        from reviews.models import Title
+
+        data = [
+            {'name': 'Чудо', 'year': 1999, 'category': 'movie',
+             'genre': ['comedy'], 'description': 'Обновлено'},
+            {'name': 'Новое', 'year': 2001, 'category': 'movie',
+             'genre': ['drama', 'comedy']},
+            {'name': 'Новое', 'year': 2001, 'category': 'movie'},
+            {'name': 'Плохое', 'year': 2001, 'category': 'nope'},
+            {'name': 'Жанр', 'year': 2001, 'category': 'movie',
+             'genre': ['nope']},
+            {'name': 'Будущее', 'year': 3000, 'category': 'movie'},
+        ]
+        response = admin_client.post(URL, data=data, format='json')
+
+        assert response.status_code == 207
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            200, 201, 400, 400, 400, 400
+        ], 'Проверьте результаты по каждому произведению'
+        assert results[0]['title']['id'] == title.id
+        assert 'category' in results[3]['errors']
+        assert 'genre' in results[4]['errors']
+        assert 'year' in results[5]['errors']
+        title.refresh_from_db()
+        assert title.description == 'Обновлено'
+        assert list(title.genre.values_list('slug', flat=True)) == ['comedy']
+        new = Title.objects.get(pk=results[1]['title']['id'])
+        assert sorted(new.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ]
+        assert results[1]['title']['genre'] == ['drama', 'comedy']
+
+        keep = admin_client.post(URL, data=[
+            {'name': 'Новое', 'year': 2001, 'category': 'movie'},
+        ], format='json')
+        assert keep.json()['results'][0]['title']['genre'] == [
+            'drama', 'comedy'
+        ], 'Проверьте, что в ответе жанры, сохранённые в БД'
+
+        repeat = admin_client.post(URL, data=data[:2], format='json')
+        assert repeat.status_code == 200, (
+            'Проверьте, что повторный импорт обновляет те же произведения'
+        )
+        assert Title.objects.count() == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_query_count_independent_of_size(self, admin_client, genres,
+                                             category):
+        from reviews.models import Title
+
+        data = [
+            {'name': f'П{number}', 'year': 2000, 'category': 'movie',
+             'genre': ['drama', 'comedy']}
+            for number in range(50)
+        ]
+        # Плюс два запроса на счётчики фасетов всей пачки и один на
+        # сохранённые жанры в ответе.
+        assert_max_queries(
+            admin_client, URL, 15, method='post', data=data, format='json'
+        )
+        response = assert_max_queries(
+            admin_client, URL, 15, method='post', data=data, format='json'
+        )
+        assert response.status_code == 200
+        assert Title.objects.count() == 50
+        assert admin_client.get('/api/v1/titles/').json()['count'] == 50, (
+            'Проверьте, что пакетный импорт сбрасывает кеш списка'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_admin_only(self, user_client, category):
+        response = user_client.post(URL, data=[
+            {'name': 'Чудо', 'year': 1999, 'category': 'movie'}
+        ], format='json')
+        assert response.status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_key_includes_category(self, admin_client, category, title):
+        from reviews.models import Categories, Title
+
+        Categories.objects.create(name='Книга', slug='book')
+        response = admin_client.post(URL, data=[
+            {'name': title.name, 'year': title.year, 'category': 'book'},
+        ], format='json')
+
+        assert response.status_code == 201, (
+            'Проверьте, что книга и фильм с одним названием и годом — '
+            'разные произведения'
+        )
+        assert response.json()['results'][0]['title']['id'] != title.id
+        assert Title.objects.filter(
+            name=title.name, year=title.year
+        ).count() == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_same_name_and_year_via_api(self, admin_client, category,
+                                        title):
+        data = {'name': title.name, 'year': title.year, 'category': 'movie'}
+
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201
+        other = admin_client.post(
+            '/api/v1/titles/', data=dict(data, name='Другое')
+        ).json()
+        response = admin_client.patch(
+            f'/api/v1/titles/{other["id"]}/',
+            data={'name': title.name, 'category': 'movie'},
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что одинаковые название и год не дают ошибку 500'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_categories_locked(self, admin_client, category):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        if not connection.features.has_select_for_update:
+            pytest.skip('SELECT ... FOR UPDATE не поддерживается')
+        with CaptureQueriesContext(connection) as context:
+            admin_client.post(URL, data=[
+                {'name': 'Чудо', 'year': 1999, 'category': 'movie'},
+            ], format='json')
+
+        assert any(
+            'FOR UPDATE' in query['sql'] and 'reviews_categories' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что пачка блокирует свои категории'
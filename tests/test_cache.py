@@ -0,0 +1,47 @@
+import pytest
+
+from .utils import assert_max_queries
+
+
+class TestResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_genres_cached_until_change(self, client, admin_client, genres):
+        url = '/api/v1/genres/'
+        assert client.get(url).json()['count'] == 2
+        assert_max_queries(client, url, 0)
+
+        response = admin_client.post(url, data={'name': 'Ужасы', 'slug': 'horror'})
+        assert response.status_code == 201
+        assert client.get(url).json()['count'] == 3, (
+            'Проверьте, что изменение жанра сбрасывает кеш ответов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_params_are_part_of_key(self, client, genres):
+        first = client.get('/api/v1/genres/?search=drama').json()
+        second = client.get('/api/v1/genres/?search=comedy').json()
+        assert first['results'] != second['results']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_title_rating_invalidated_by_review(self, client, user_client,
+                                                title):
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['rating'] is None
+        assert client.get('/api/v1/titles/').json()['results'][0][
+            'rating'] is None
+
+        user_client.post(f'{url}reviews/', data={'text': 'Да', 'score': 7})
+
+        assert client.get(url).json()['rating'] == 7
+        assert client.get('/api/v1/titles/').json()['results'][0][
+            'rating'] == 7
+
+    @pytest.mark.django_db(transaction=True)
+    def test_category_change_invalidates_titles(self, client, title,
+                                                category):
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['category']['name'] == 'Фильм'
+        category.name = 'Кино'
+        category.save()
+        assert client.get(url).json()['category']['name'] == 'Кино'
@@ -0,0 +1,107 @@
+import datetime
+import json
+
+import pytest
+
+from .utils import assert_max_queries
+
+
+@pytest.fixture
+def catalog(title, category, admin, user, django_user_model):
+    """Больше страницы произведений и отзывов, пустые значения полей."""
+    from reviews.models import Comments, Review, Title
+
+    Title.objects.create(name='Без категории', year=2000, description='')
+    for number in range(5):
+        Title.objects.create(
+            name=f'Произведение {number}', year=2001, category=category
+        )
+    for number in range(5):
+        Review.objects.create(
+            title=title, text='Отзыв', score=5,
+            author=django_user_model.objects.create(
+                username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+            ),
+        )
+    review = Review.objects.create(
+        title=title, author=user, text='Хорошо', score=7
+    )
+    second = Review.objects.create(
+        title=title, author=admin, text='Отлично', score=10
+    )
+    Review.objects.filter(pk=second.pk).update(
+        pub_date=review.pub_date + datetime.timedelta(microseconds=1)
+    )
+    Title.update_rating(title.pk, count_delta=7, score_delta=42)
+    for number, author in enumerate((user, admin, user)):
+        Comments.objects.create(
+            review=review, author=author, text=f'Комментарий {number}'
+        )
+    return title, review
+
+
+def responses(client, settings, url):
+    """Ответы DRF-сериализаторов и компактных для одного запроса."""
+    from django.core.cache import cache
+
+    result = []
+    for compact in (False, True):
+        settings.COMPACT_SERIALIZATION = compact
+        cache.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        result.append(response.content)
+    return result
+
+
+class TestCompactSerialization:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?page=2',
+        '/api/v1/titles/?genre=drama',
+        '/api/v1/titles/?fields=name,genre,rating',
+        '/api/v1/titles/?fields=category',
+        '/api/v1/titles/?facets=genre,year',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/?cursor=',
+        '/api/v1/titles/{title}/reviews/?fields=author,pub_date',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/?cursor=',
+        '/api/v1/titles/{title}/reviews/{review}/comments/?fields=text',
+    ])
+    def test_identical_json(self, client, settings, catalog, url):
+        title, review = catalog
+        drf, compact = responses(
+            client, settings, url.format(title=title.pk, review=review.pk)
+        )
+
+        assert compact == drf, (
+            'Проверьте, что компактная сериализация отдаёт тот же JSON, '
+            'что и сериализаторы DRF'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cursor_pages_identical(self, client, settings, catalog):
+        title, _ = catalog
+        url = f'/api/v1/titles/{title.pk}/reviews/?cursor='
+        drf, compact = responses(client, settings, url)
+        assert compact == drf
+
+        next_url = json.loads(compact)['next']
+        assert next_url
+        drf, compact = responses(client, settings, next_url)
+        assert compact == drf, (
+            'Проверьте, что курсор компактной страницы ведёт туда же'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_query_count(self, client, settings, catalog):
+        settings.COMPACT_SERIALIZATION = True
+
+        assert_max_queries(client, '/api/v1/titles/', 3)
+        title, _ = catalog
+        assert_max_queries(
+            client, f'/api/v1/titles/{title.pk}/reviews/', 2
+        )
@@ -0,0 +1,66 @@
+import pytest
+
+from .utils import assert_max_queries
+
+
+class TestConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reviews_not_modified(self, client, user_client, admin_client,
+                                  title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, data={'text': 'Первый', 'score': 5})
+        response = client.get(url)
+        etag = response['ETag']
+        assert response.has_header('Last-Modified')
+
+        response = assert_max_queries(
+            client, url, 0, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+        admin_client.post(url, data={'text': 'Второй', 'score': 6})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый отзыв меняет ETag списка отзывов'
+        )
+        assert response['ETag'] != etag
+
+    @pytest.mark.django_db(transaction=True)
+    def test_title_if_modified_since(self, client, title):
+        url = f'/api/v1/titles/{title.id}/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_etag(self, client, user_client, title, user):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        etag = client.get(url)['ETag']
+        user_client.post(url, data={'text': 'Комментарий'})
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_versions_read_from_shared_cache(self, client, title):
+        from api.cache import version_key
+        from django.conf import settings
+        from django.core.cache.backends.locmem import LocMemCache
+
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        # Клиент кеша другого воркера с тем же хранилищем.
+        other_worker = LocMemCache(settings.CACHES['default']['LOCATION'], {})
+        key = version_key(f'reviews:{title.id}')
+        other_worker.set(key, other_worker.get(key) + 1, None)
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag строится по версиям из общего кеша'
+        )
+        assert response['ETag'] != etag
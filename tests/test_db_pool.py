@@ -0,0 +1,236 @@
+import json
+import threading
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    from api_yamdb.db_pool import ConnectionPool
+
+    options = {'connect': FakeConnection, 'check': lambda raw: True}
+    options.update(kwargs)
+    return ConnectionPool(**options)
+
+
+class TestConnectionPool:
+
+    def test_reuses_connections(self):
+        pool = make_pool(max_size=2)
+
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first, (
+            'Проверьте, что пул отдаёт свободное соединение повторно'
+        )
+        assert pool.snapshot()['opened'] == 1
+
+    def test_bounded(self):
+        from api_yamdb.db_pool import PoolExhaustedError
+
+        pool = make_pool(max_size=2, timeout=0.05)
+        pool.acquire()
+        second = pool.acquire()
+
+        with pytest.raises(PoolExhaustedError):
+            pool.acquire()
+        assert pool.snapshot()['timeouts'] == 1
+
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(
+            pool.acquire()
+        ))
+        pool.timeout = 5
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(second)
+        waiter.join(1)
+        assert acquired == [second], (
+            'Проверьте, что ожидающий поток получает освободившееся соединение'
+        )
+        stats = pool.snapshot()
+        assert (stats['size'], stats['in_use'], stats['waits']) == (2, 2, 2)
+
+    def test_health_check_and_max_age(self):
+        healthy = {'value': False}
+        pool = make_pool(
+            max_size=1, check_interval=0,
+            check=lambda raw: healthy['value'],
+        )
+        broken = pool.acquire()
+        pool.release(broken)
+
+        replacement = pool.acquire()
+        assert replacement is not broken and broken.closed, (
+            'Проверьте, что негодное соединение закрывается и заменяется'
+        )
+        assert pool.snapshot()['failed_checks'] == 1
+
+        pool.release(replacement)
+        pool.max_age = 0
+        healthy['value'] = True
+        assert pool.acquire() is not replacement
+        assert replacement.closed
+        assert pool.snapshot()['size'] == 1
+
+    def test_release_not_reusable(self):
+        pool = make_pool(max_size=1)
+        raw = pool.acquire()
+        pool.release(raw, reusable=False)
+
+        assert raw.closed
+        assert pool.acquire() is not raw
+
+    def test_forked_process_drops_parent_connections(self, monkeypatch):
+        pool = make_pool(max_size=1)
+        parent = pool.acquire()
+        pool.release(parent)
+        in_use = pool.acquire()
+
+        monkeypatch.setattr('os.getpid', lambda: pool.pid + 1)
+        pool.release(in_use)
+        child = pool.acquire()
+
+        assert child is not parent and child is not in_use, (
+            'Проверьте, что после fork пул не отдаёт соединения родителя'
+        )
+        assert not parent.closed, (
+            'Проверьте, что соединения родителя не закрываются в потомке'
+        )
+        assert pool.inherited == [parent]
+        assert pool.snapshot()['size'] == 1
+
+
+@pytest.fixture
+def pooled_connection(db):
+    """Соединение бэкенда api_yamdb.db_pool.postgresql с тестовой БД."""
+    from django.db import connection
+
+    if connection.vendor != 'postgresql':
+        pytest.skip('Пул работает только с PostgreSQL')
+    from api_yamdb.db_pool.postgresql.base import POOLS, DatabaseWrapper
+
+    wrapper = DatabaseWrapper(dict(
+        connection.settings_dict, CONN_MAX_AGE=0,
+        POOL={'MAX_SIZE': 1, 'TIMEOUT': 1},
+    ), alias='pooled')
+    yield wrapper
+    wrapper.close()
+    POOLS.pop('pooled').close_idle()
+
+
+def backend_pid(wrapper):
+    with wrapper.cursor() as cursor:
+        cursor.execute('SELECT pg_backend_pid()')
+        return cursor.fetchone()[0]
+
+
+class TestPostgresPool:
+
+    def test_reuses_server_session(self, pooled_connection):
+        first = backend_pid(pooled_connection)
+        with pooled_connection.cursor() as cursor:
+            cursor.execute('BEGIN')
+        pooled_connection.close()
+
+        pooled_connection.ensure_connection()
+        assert not pooled_connection.connection.get_transaction_status(), (
+            'Проверьте, что незавершённая транзакция откатывается'
+        )
+        assert backend_pid(pooled_connection) == first, (
+            'Проверьте, что соединение возвращается в пул и выдаётся снова'
+        )
+
+    def test_dropped_connection_frees_slot(self, pooled_connection):
+        from api_yamdb.db_pool.postgresql.base import POOLS
+
+        first = backend_pid(pooled_connection)
+        pooled_connection.connection.close()
+        pooled_connection.close()
+
+        assert POOLS['pooled'].snapshot()['size'] == 0
+        assert backend_pid(pooled_connection) != first
+
+    def test_fork(self, pooled_connection):
+        import gc
+        import os
+
+        parent = backend_pid(pooled_connection)
+        pooled_connection.close()
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                pooled_connection.connection = None
+                child = backend_pid(pooled_connection)
+                pooled_connection.close()
+                gc.collect()
+                os.write(write, str(child).encode())
+            finally:
+                os._exit(0)
+        os.close(write)
+        os.waitpid(pid, 0)
+        child = int(os.read(read, 32))
+        os.close(read)
+
+        assert child != parent, (
+            'Проверьте, что потомок открывает своё соединение'
+        )
+        assert backend_pid(pooled_connection) == parent, (
+            'Проверьте, что потомок не обрывает соединение родителя'
+        )
+
+
+class TestPersistentConnections:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_idle_connection_checked(self, settings, monkeypatch):
+        from api_yamdb.db_pool import check_persistent_connections
+        from django.db import connection
+
+        settings.CONN_HEALTH_CHECK_INTERVAL = 0.5
+        connection.ensure_connection()
+        monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', 60)
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        # Тестовая БД SQLite в памяти не закрывается, поэтому close
+        # подменяется.
+        closed = []
+        monkeypatch.setattr(connection, 'close', lambda: closed.append(1))
+        connection.released_at = time.monotonic()
+
+        check_persistent_connections()
+        assert not closed, (
+            'Проверьте, что недавно использованное соединение не проверяется'
+        )
+
+        connection.released_at = time.monotonic() - 1
+        check_persistent_connections()
+        assert closed, (
+            'Проверьте, что негодное постоянное соединение закрывается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_benchmark_connections(self):
+        out = StringIO()
+        call_command(
+            'benchmark_connections', requests=20, threads=4, pool_size=2,
+            json=True, stdout=out,
+        )
+
+        report = json.loads(out.getvalue())
+        assert set(report) == {
+            'connect_per_request', 'persistent', 'pooled'
+        }
+        assert report['pooled']['pool']['opened'] <= 2
+        assert report['pooled']['requests'] == 20
@@ -0,0 +1,116 @@
+import pytest
+
+from .utils import assert_max_queries
+
+URL = '/api/v1/titles/'
+
+
+def facet_counts():
+    from api.facets import FACETS
+    from reviews.models import TitleFacet
+
+    return TitleFacet.counts(FACETS)
+
+
+def rebuilt_counts():
+    from reviews.models import TitleFacet
+
+    TitleFacet.rebuild()
+    return facet_counts()
+
+
+class TestTitleFacets:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_counts_follow_changes(self, admin_client, category, genres,
+                                   title):
+        from reviews.models import Categories, Genres, Title
+
+        response = admin_client.post(URL, data={
+            'name': 'Новое', 'year': 2001, 'category': 'movie',
+            'genre': ['drama'],
+        })
+        assert response.status_code == 201
+        other = Categories.objects.create(name='Книга', slug='book')
+        response = admin_client.patch(
+            f'{URL}{title.id}/', data={'category': 'book', 'year': 2001}
+        )
+        assert response.status_code == 200
+        Title.objects.get(pk=title.id).genre.remove(genres[1])
+        admin_client.post(f'{URL}bulk/', data=[
+            {'name': 'Пачка', 'year': 1999, 'category': 'movie',
+             'genre': ['comedy']},
+            {'name': 'Новое', 'year': 2001, 'category': 'book',
+             'genre': ['comedy']},
+        ], format='json')
+        incremental = facet_counts()
+        assert incremental == rebuilt_counts(), (
+            'Проверьте, что счётчики фасетов сдвигаются при изменении '
+            'произведений и их жанров'
+        )
+        assert incremental['category'] == {category.id: 2, other.id: 2}
+
+        Genres.objects.filter(slug='comedy').delete()
+        admin_client.delete(f'{URL}{title.id}/')
+        assert facet_counts() == rebuilt_counts(), (
+            'Проверьте, что удаление произведений и жанров сдвигает счётчики'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_unfiltered_facets(self, admin_client, title):
+        response = assert_max_queries(
+            admin_client, f'{URL}?facets=genre,category,year', 8
+        )
+
+        assert response.status_code == 200
+        assert response.json()['facets'] == {
+            'genre': [
+                {'slug': 'comedy', 'count': 1},
+                {'slug': 'drama', 'count': 1},
+            ],
+            'category': [{'slug': 'movie', 'count': 1}],
+            'year': [{'year': 1999, 'count': 1}],
+        }, 'Проверьте, что ?facets= добавляет счётчики к списку'
+        assert 'facets' not in admin_client.get(URL).json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_filtered_facets(self, admin_client, category, genres, title):
+        from reviews.models import Title
+
+        other = Title.objects.create(name='Другое', year=2005,
+                                     category=category)
+        other.genre.set(genres[:1])
+        Title.objects.create(name='Третье', year=2005, category=category)
+
+        response = admin_client.get(f'{URL}?genre=drama&facets=genre,year')
+
+        assert response.status_code == 200
+        assert response.json()['facets'] == {
+            'genre': [
+                {'slug': 'drama', 'count': 2},
+                {'slug': 'comedy', 'count': 1},
+            ],
+            'year': [
+                {'year': 1999, 'count': 1},
+                {'year': 2005, 'count': 1},
+            ],
+        }, 'Проверьте, что фасеты считаются по текущему фильтру'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_unknown_facet(self, admin_client):
+        response = admin_client.get(f'{URL}?facets=genre,author')
+
+        assert response.status_code == 400
+        assert 'facets' in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_facets(self, title):
+        from django.core.management import call_command
+        from reviews.models import TitleFacet
+
+        expected = facet_counts()
+        TitleFacet.objects.all().delete()
+
+        call_command('rebuild_facets')
+
+        assert facet_counts() == expected
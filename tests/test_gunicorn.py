@@ -0,0 +1,64 @@
+import os
+import runpy
+
+import pytest
+
+
+@pytest.fixture
+def gunicorn_config(monkeypatch, settings):
+    monkeypatch.setenv('METRICS_DIR', '')
+    return runpy.run_path(os.path.join(settings.BASE_DIR, 'gunicorn.conf.py'))
+
+
+class TestGunicornConfig:
+
+    def test_local_cache_needs_one_worker(self, gunicorn_config, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        check_shared_cache = gunicorn_config['check_shared_cache']
+
+        check_shared_cache(1)
+        with pytest.raises(RuntimeError, match='CACHE_BACKEND'):
+            check_shared_cache(3)
+
+    def test_shared_cache_allows_workers(self, gunicorn_config, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': 'memcached:11211',
+        }}
+        gunicorn_config['check_shared_cache'](3)
+
+    def test_connection_budget(self, gunicorn_config, settings):
+        settings.DATABASES = {'default': {
+            'ENGINE': 'api_yamdb.db_pool.postgresql',
+            'POOL': {'MAX_SIZE': 10},
+        }}
+        settings.DB_CONNECTION_BUDGET = 90
+        check_connection_budget = gunicorn_config['check_connection_budget']
+
+        check_connection_budget(9, 32)
+        check_connection_budget(90, 1)
+        with pytest.raises(RuntimeError, match='DB_CONNECTION_BUDGET'):
+            check_connection_budget(10, 32)
+
+    def test_connection_budget_without_pool(self, gunicorn_config,
+                                            settings):
+        settings.DATABASES = {'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+        }}
+        settings.DB_CONNECTION_BUDGET = 90
+
+        with pytest.raises(RuntimeError, match='WEB_CONCURRENCY'):
+            gunicorn_config['check_connection_budget'](4, 32)
+
+    def test_explicit_workers(self, monkeypatch, settings):
+        monkeypatch.setenv('METRICS_DIR', '')
+        monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+        path = os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+
+        assert runpy.run_path(path)['workers'] == 1
+        monkeypatch.setenv('SERVER_MODE', 'gthread')
+        config = runpy.run_path(path)
+        assert config['worker_class'] == 'gthread'
+        assert config['threads'] == 8
@@ -0,0 +1,145 @@
+import datetime
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+PUB_DATE = datetime.datetime(
+    2019, 9, 24, 21, 8, 21, 567000, tzinfo=timezone.utc
+)
+
+CSV_FILES = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+        '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': 'id,name,year,category\n1,Побег,1994,1\n2,Крестный,1972,1\n',
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,1,2\n3,2,1\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,Отлично,100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,Неплохо,101,6,2019-09-24T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Согласен,101,2019-09-24T21:08:21.567Z\n'
+    ),
+}
+
+
+@pytest.fixture
+def fresh_sequences(django_db_reset_sequences):
+    """Последовательности id начинаются с единицы.
+
+    На SQLite reset_sequences не действует: AUTOINCREMENT помнит
+    наибольший выданный id и после очистки таблиц между тестами.
+    """
+    from django.db import connection
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM sqlite_sequence')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, content in CSV_FILES.items():
+        (tmp_path / name).write_text(content, encoding='utf-8')
+    return tmp_path
+
+
+class TestLoadData:
+
+    def test_load_data(self, fresh_sequences, data_dir):
+        from reviews.models import Comments, GenreTitle, Review, Title
+
+        call_command('load_data', data_dir=str(data_dir), batch_size=1)
+
+        assert Title.objects.count() == 2
+        assert GenreTitle.objects.count() == 3
+        assert Review.objects.count() == 2
+        assert Comments.objects.count() == 1
+        assert Title.objects.get(pk=1).rating == 8, (
+            'Проверьте, что load_data пересчитывает рейтинг произведений'
+        )
+        assert Review.objects.get(pk=1).pub_date == PUB_DATE, (
+            'Проверьте, что load_data сохраняет pub_date из CSV'
+        )
+        assert Comments.objects.get().pub_date == PUB_DATE
+        review = Review.objects.create(
+            title_id=2, author_id=100, text='Новый', score=5
+        )
+        assert review.pub_date > PUB_DATE, (
+            'Проверьте, что после загрузки auto_now_add снова включён'
+        )
+        title = Title.objects.create(name='Новое', year=2000)
+        assert title.pk == 3, (
+            'Проверьте, что load_data сдвигает последовательности id'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_resume_from_failed_table(self, data_dir):
+        from reviews.models import Comments, Review
+
+        (data_dir / 'review.csv').write_text('id,title_id\n1,1\n')
+        with pytest.raises(CommandError, match='--resume-from review'):
+            call_command('load_data', data_dir=str(data_dir))
+        assert not Review.objects.exists()
+
+        (data_dir / 'review.csv').write_text(
+            CSV_FILES['review.csv'], encoding='utf-8'
+        )
+        call_command(
+            'load_data', data_dir=str(data_dir), resume_from='review'
+        )
+        assert Review.objects.count() == 2
+        assert Comments.objects.count() == 1
+
+    def test_dependency_graph(self):
+        from reviews.management.commands.load_data import (TABLES,
+                                                           dependency_graph)
+
+        graph = dependency_graph(list(TABLES))
+        assert graph['users'] == graph['category'] == graph['genre'] == set()
+        assert graph['titles'] == {'category'}
+        assert graph['genre_title'] == {'titles', 'genre'}
+        assert graph['review'] == {'titles', 'users'}
+        assert graph['comments'] == {'review', 'users'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_copy_falls_back_to_orm(self, data_dir):
+        from reviews.models import Review
+
+        call_command('load_data', data_dir=str(data_dir), copy=True)
+        assert Review.objects.count() == 2
+        assert set(Review.objects.values_list('pub_date', flat=True)) == {
+            PUB_DATE
+        }
+
+    def test_copy_stream(self, data_dir):
+        from reviews.management.commands.load_data import (TABLES, CopyStream,
+                                                           copy_lines)
+        from reviews.models import Title
+
+        _, model, columns = TABLES['titles']
+        stream = CopyStream(
+            copy_lines(str(data_dir / 'titles.csv'), model, columns)
+        )
+        chunks = []
+        while True:
+            chunk = stream.read(16)
+            if not chunk:
+                break
+            assert len(chunk) <= 16
+            chunks.append(chunk)
+
+        assert stream.rows == 2
+        names = [field.attname for field in Title._meta.concrete_fields]
+        first = ''.join(chunks).splitlines()[0].split(',')
+        row = dict(zip(names, first))
+        assert row['name'] == 'Побег'
+        assert row['description'] == r'\N'
+        assert row['review_count'] == '0'
@@ -0,0 +1,21 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class TestLoadTest:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_load_test(self, live_server, title):
+        out = StringIO()
+        call_command(
+            'load_test', target=[('wsgi', live_server.url)], requests=10,
+            concurrency=2, title_id=title.pk, json=True, stdout=out,
+        )
+
+        report = json.loads(out.getvalue())['wsgi']
+        assert report['requests'] + report['errors'] == 10
+        assert report['throughput'] > 0
+        assert report['p50'] <= report['p95'] <= report['p99']
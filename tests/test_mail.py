@@ -0,0 +1,94 @@
+import pytest
+from django.core import mail
+from django.core.mail import BadHeaderError
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise OSError('SMTP недоступен')
+
+
+class PickyBackend(EmailBackend):
+    """Не принимает письма на bad@, считает закрытия соединения."""
+    closed = 0
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            if 'bad@yamdb.fake' in message.to:
+                raise BadHeaderError('Перевод строки в заголовке')
+        return super().send_messages(email_messages)
+
+    def close(self):
+        PickyBackend.closed += 1
+
+
+class TestMailQueue:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_signup_enqueues_mail(self, client):
+        from users.models import OutgoingMail
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'new@yamdb.fake', 'username': 'newbie'
+        })
+        assert response.status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что письмо не отправляется внутри запроса'
+        )
+        assert OutgoingMail.objects.filter(recipient='new@yamdb.fake').exists()
+
+        call_command('deliver_mail')
+
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new@yamdb.fake']
+        assert not OutgoingMail.objects.filter(sent_at__isnull=True).exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_failed_mail_is_retried_later(self, settings):
+        from users.mailer import deliver_batch, enqueue_mail
+        from users.models import OutgoingMail
+
+        enqueue_mail('Тема', 'Текст', 'support@yamdb.ru', 'a@yamdb.fake')
+        settings.EMAIL_BACKEND = 'tests.test_mail.FailingBackend'
+
+        assert deliver_batch(10, max_attempts=3) == (0, 1)
+        queued = OutgoingMail.objects.get()
+        assert queued.attempts == 1
+        assert queued.last_error == 'SMTP недоступен'
+        assert queued.send_after > queued.created, (
+            'Проверьте, что повторная отправка откладывается'
+        )
+        assert deliver_batch(10, max_attempts=3) == (0, 0)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_one_bad_mail_does_not_block_batch(self, settings):
+        from users.mailer import deliver_batch, enqueue_mail
+        from users.models import OutgoingMail
+
+        for recipient in ('a@yamdb.fake', 'bad@yamdb.fake', 'b@yamdb.fake'):
+            enqueue_mail('Тема', 'Текст', 'support@yamdb.ru', recipient)
+        settings.EMAIL_BACKEND = 'tests.test_mail.PickyBackend'
+        PickyBackend.closed = 0
+
+        assert deliver_batch(10, max_attempts=3) == (2, 1)
+        assert PickyBackend.closed == 1, (
+            'Проверьте, что соединение закрывается после пачки'
+        )
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            'a@yamdb.fake', 'b@yamdb.fake'
+        ]
+        bad = OutgoingMail.objects.get(recipient='bad@yamdb.fake')
+        assert bad.sent_at is None
+        assert bad.attempts == 1
+        assert bad.last_error == 'Перевод строки в заголовке'
+
+        OutgoingMail.objects.update(send_after=bad.created)
+        assert deliver_batch(10, max_attempts=3) == (0, 1), (
+            'Проверьте, что отправленные письма не отправляются повторно'
+        )
+        assert len(mail.outbox) == 2
+        assert OutgoingMail.objects.get(pk=bad.pk).attempts == 2
@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+
+class TestMetricsRegistry:
+
+    def test_aggregates_worker_files(self, tmp_path):
+        from api.metrics import MetricsRegistry
+
+        registry = MetricsRegistry(directory=str(tmp_path))
+        registry.inc('yamdb_db_queries_total', {'view': 'a'}, 3)
+        registry.observe(
+            'yamdb_request_duration_seconds', 0.02, {'view': 'a'},
+        )
+        other = MetricsRegistry()
+        other.inc('yamdb_db_queries_total', {'view': 'a'}, 2)
+        other.observe('yamdb_request_duration_seconds', 3, {'view': 'a'})
+        with open(os.path.join(tmp_path, '1.json'), 'w') as worker_file:
+            json.dump(other.snapshot(), worker_file)
+
+        text = registry.render()
+
+        assert 'yamdb_db_queries_total{view="a"} 5.0' in text, (
+            'Проверьте, что счётчики воркеров суммируются'
+        )
+        assert 'yamdb_request_duration_seconds_count{view="a"} 2' in text
+        assert (
+            'yamdb_request_duration_seconds_bucket{view="a",le="0.025"} 1'
+            in text
+        )
+        assert (
+            'yamdb_request_duration_seconds_bucket{view="a",le="+Inf"} 2'
+            in text
+        )
+        assert '# TYPE yamdb_request_duration_seconds histogram' in text
+
+
+class TestMetricsEndpoint:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_metrics(self, client, genres):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/users/me/', HTTP_AUTHORIZATION='Bearer broken')
+
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert (
+            'yamdb_request_duration_seconds_count'
+            '{method="GET",view="api:genres-list"}' in text
+        ), 'Проверьте, что замеряется время ответа по маршрутам'
+        assert 'yamdb_db_queries_total{method="GET",view="api:genres-list"}' in text
+        assert (
+            'yamdb_cache_requests_total{cache="response",result="hit"}'
+            in text
+        )
+        assert (
+            'yamdb_auth_failures_total{reason="token_not_valid"}' in text
+        ), 'Проверьте, что учитываются ошибки аутентификации'
+
+    def test_metrics_token(self, client, settings):
+        settings.METRICS_TOKEN = 'secret'
+
+        assert client.get('/metrics').status_code == 401
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        ).status_code == 200
@@ -0,0 +1,72 @@
+import logging
+import time
+
+import pytest
+
+
+class TestRequestMetrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_server_timing_and_log(self, client, settings, caplog, title):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 1
+        settings.REQUEST_METRICS_SLOW_QUERY_MS = 0
+
+        with caplog.at_level(logging.INFO, logger='api.requests'):
+            response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+
+        assert response.status_code == 200
+        timing = response['Server-Timing']
+        assert timing.startswith('db;dur=') and 'render;dur=' in timing, (
+            'Проверьте, что ответ содержит заголовок Server-Timing'
+        )
+        assert 'serialize;dur=' in timing
+        metrics = caplog.records[-1].metrics
+        assert metrics['view'] == 'api:reviews-list'
+        assert metrics['status'] == 200
+        assert metrics['queries'] > 0
+        assert metrics['serialize_ms'] > 0
+        assert metrics['render_ms'] > 0
+        assert metrics['response_bytes'] == len(response.content)
+        assert len(metrics['slow_queries']) == metrics['queries'], (
+            'Проверьте, что SQL запросов дольше порога попадает в лог'
+        )
+        assert 'SELECT' in metrics['slow_queries'][0]['sql']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_serialize_phase(self, client, settings, caplog, monkeypatch,
+                             title, user):
+        from api.serializers import ReviewSerializer
+        from reviews.models import Review
+
+        Review.objects.create(title=title, author=user, text='Текст', score=5)
+
+        settings.REQUEST_METRICS_SAMPLE_RATE = 1
+        settings.COMPACT_SERIALIZATION = False
+        to_representation = ReviewSerializer.to_representation
+
+        def slow(self, instance):
+            time.sleep(0.05)
+            return to_representation(self, instance)
+
+        monkeypatch.setattr(ReviewSerializer, 'to_representation', slow)
+        with caplog.at_level(logging.INFO, logger='api.requests'):
+            response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+
+        assert response.status_code == 200
+        metrics = caplog.records[-1].metrics
+        assert metrics['serialize_ms'] >= 50, (
+            'Проверьте, что serializer.data замеряется отдельной фазой'
+        )
+        assert metrics['render_ms'] < 50, (
+            'Проверьте, что сериализация не входит во время рендеринга'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_not_sampled(self, client, settings, caplog, genres):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 0
+
+        with caplog.at_level(logging.INFO, logger='api.requests'):
+            response = client.get('/api/v1/genres/')
+
+        assert 'Server-Timing' not in response
+        assert not caplog.records
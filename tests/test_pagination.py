@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def reviews(django_user_model, title):
+    from reviews.models import Review
+
+    return [
+        Review.objects.create(
+            title=title, text=f'Отзыв {number}', score=5,
+            author=django_user_model.objects.create_user(
+                username=f'reader{number}',
+                email=f'reader{number}@yamdb.fake',
+            ),
+        )
+        for number in range(7)
+    ]
+
+
+class TestKeysetPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_page_number_by_default(self, client, title, reviews):
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/?page=2')
+        data = response.json()
+        assert data['count'] == 7
+        assert [review['id'] for review in data['results']] == [
+            review.id for review in reviews[5:]
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cursor_mode(self, client, title, reviews):
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor='
+        seen = []
+        while url:
+            data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не считается COUNT(*)'
+            )
+            seen.extend(review['id'] for review in data['results'])
+            url = data['next']
+        assert seen == [review.id for review in reviews]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_invalid_cursor(self, client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=broken'
+        assert client.get(url).status_code == 404
+
+
+class TestCountModes:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_exact_count_by_default(self, user_client, title, reviews):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert user_client.get(url).json()['count'] == 7
+        user_client.post(url, data={'text': 'Ещё отзыв', 'score': 5})
+        assert user_client.get(url).json()['count'] == 8
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cached_count(self, settings, user_client, title, reviews):
+        from reviews.models import Review
+
+        settings.PAGINATION_COUNT_MODE = 'cached'
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert user_client.get(url).json()['count'] == 7
+        Review.objects.filter(title=title).update(text='Без сигналов')
+        with CaptureQueriesContext(connection) as queries:
+            assert user_client.get(url).json()['count'] == 7
+        assert not [
+            query for query in queries if 'COUNT' in query['sql']
+        ], 'Проверьте, что в режиме cached count берётся из кеша'
+
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 5})
+        assert response.status_code == 201
+        assert user_client.get(url).json()['count'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кешированный count'
+        )
+        user_client.delete(f'{url}{response.json()["id"]}/')
+        assert user_client.get(url).json()['count'] == 7
+
+    @pytest.mark.django_db(transaction=True)
+    def test_estimate_falls_back_to_exact(self, category, genres):
+        from api.pagination import CountedPageNumberPagination
+        from reviews.models import Title
+
+        Title.objects.create(name='Первое', year=2000, category=category)
+        view = type('View', (), {'count_mode': 'estimate'})()
+        count = CountedPageNumberPagination().get_count_function(
+            Title.objects.all(), view
+        )
+        assert count() == 1
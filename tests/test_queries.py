@@ -0,0 +1,26 @@
+import pytest
+
+from .utils import assert_max_queries
+
+
+class TestQueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_titles_list(self, client, category, genres):
+        from reviews.models import Title
+
+        for number in range(5):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres)
+
+        response = assert_max_queries(client, '/api/v1/titles/', 3)
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_title_detail(self, client, title):
+        response = assert_max_queries(client, f'/api/v1/titles/{title.id}/', 2)
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
@@ -0,0 +1,157 @@
+import datetime
+
+import pytest
+
+from .utils import assert_max_queries
+
+URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def catalog(category, genres, admin, user, django_user_model):
+    from reviews.models import Categories, Review, Title
+
+    book = Categories.objects.create(name='Книга', slug='book')
+    titles = {
+        name: Title.objects.create(name=name, year=2000, category=category)
+        for name in ('Лучшее', 'Среднее', 'Старое')
+    }
+    titles['Книга'] = Title.objects.create(name='Книга', year=2000,
+                                           category=book)
+    titles['Лучшее'].genre.set(genres[:1])
+    titles['Среднее'].genre.set(genres)
+    scores = {'Лучшее': (9, 10), 'Среднее': (5, 6), 'Старое': (8, 8),
+              'Книга': (7, 7)}
+    for name, (first, second) in scores.items():
+        for author, score in ((admin, first), (user, second)):
+            review = Review.objects.create(
+                title=titles[name], author=author, text='Текст', score=score
+            )
+            Title.update_rating(titles[name].pk, 1, score)
+            if name == 'Старое':
+                Review.objects.filter(pk=review.pk).update(
+                    pub_date=review.pub_date - datetime.timedelta(days=30)
+                )
+    reader = django_user_model.objects.create(
+        username='reader', email='reader@yamdb.fake'
+    )
+    Review.objects.create(
+        title=titles['Книга'], author=reader, text='Ещё', score=7
+    )
+    Title.update_rating(titles['Книга'].pk, 1, 7)
+    return titles
+
+
+def names(response):
+    assert response.status_code == 200
+    return [place['title']['name'] for place in response.json()['results']]
+
+
+class TestRankings:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_top(self, client, catalog):
+        from api.rankings import refresh_rankings
+
+        refresh_rankings()
+
+        response = assert_max_queries(client, f'{URL}top/', 4)
+        assert names(response) == ['Лучшее', 'Старое', 'Книга', 'Среднее'], (
+            'Проверьте, что /titles/top/ сортирует по рейтингу'
+        )
+        assert response.json()['results'][0]['rank'] == 1
+        assert response.json()['results'][0]['score'] == 9.5
+        assert names(client.get(f'{URL}top/?genre=comedy')) == ['Среднее']
+        assert names(client.get(f'{URL}top/?category=book')) == ['Книга']
+        assert names(client.get(f'{URL}top/?limit=2')) == [
+            'Лучшее', 'Старое'
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_trending(self, client, catalog):
+        from api.rankings import refresh_rankings
+
+        refresh_rankings()
+
+        response = client.get(f'{URL}trending/')
+        assert names(response) == ['Книга', 'Лучшее', 'Среднее'], (
+            'Проверьте, что /titles/trending/ считает только свежие отзывы'
+        )
+        assert response.json()['days'] == 7
+        assert [
+            place['score'] for place in response.json()['results']
+        ] == [3, 2, 2]
+        assert names(client.get(f'{URL}trending/?genre=drama')) == [
+            'Лучшее', 'Среднее'
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_served_from_ranking_until_refresh(self, client, catalog):
+        from api.rankings import refresh_rankings
+        from reviews.models import Title
+
+        refresh_rankings()
+        assert names(client.get(f'{URL}top/'))[0] == 'Лучшее'
+
+        Title.objects.filter(name='Среднее').update(rating=10)
+        assert names(client.get(f'{URL}top/'))[0] == 'Лучшее', (
+            'Проверьте, что рейтинг читается из пересобранной таблицы'
+        )
+        refresh_rankings()
+        assert names(client.get(f'{URL}top/'))[0] == 'Среднее', (
+            'Проверьте, что refresh_rankings сбрасывает кеш ответов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cached_until_refresh_interval(self, client, catalog, settings,
+                                           monkeypatch):
+        import time
+
+        from api.rankings import refresh_rankings
+        from django.utils import timezone
+        from reviews.models import Title, TitleRanking
+
+        settings.RESPONSE_CACHE_TIMEOUT = 3600
+        refresh_rankings()
+        assert names(client.get(f'{URL}top/'))[0] == 'Лучшее'
+
+        # Пересборка в другом процессе, сброс кеша до воркера не дошёл.
+        Title.objects.filter(name='Среднее').update(rating=10)
+        TitleRanking.refresh(
+            size=settings.RANKING_SIZE, days=settings.RANKING_TRENDING_DAYS,
+            now=timezone.now(),
+        )
+        assert names(client.get(f'{URL}top/'))[0] == 'Лучшее'
+
+        now = time.time()
+        monkeypatch.setattr(
+            'time.time', lambda: now + settings.RANKING_REFRESH_INTERVAL + 1
+        )
+        assert names(client.get(f'{URL}top/'))[0] == 'Среднее', (
+            'Проверьте, что ответы рейтингов кешируются не дольше '
+            'RANKING_REFRESH_INTERVAL'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_invalid_params(self, client, catalog):
+        assert client.get(f'{URL}top/?genre=nope').status_code == 404
+        assert client.get(
+            f'{URL}top/?genre=drama&category=movie'
+        ).status_code == 400
+        assert client.get(f'{URL}top/?limit=0').status_code == 400
+        assert client.get(f'{URL}top/?limit=1000').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_command(self, catalog):
+        from io import StringIO
+
+        from django.core.management import call_command
+        from reviews.models import TitleRanking
+
+        out = StringIO()
+        call_command('refresh_rankings', stdout=out)
+
+        assert 'Refreshed rankings' in out.getvalue()
+        assert TitleRanking.objects.filter(
+            board=TitleRanking.TOP, scope=''
+        ).count() == 4
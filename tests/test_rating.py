@@ -0,0 +1,48 @@
+import pytest
+from django.core.management import call_command
+
+
+class TestTitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rating_follows_reviews(self, user_client, admin_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Хорошо', 'score': 4})
+        assert response.status_code == 201
+        response = admin_client.post(url, data={'text': 'Отлично', 'score': 9})
+        assert response.status_code == 201
+        review_id = response.json()['id']
+
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (2, 13), (
+            'Проверьте, что создание отзыва обновляет агрегаты рейтинга'
+        )
+        response = admin_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['rating'] == 6
+
+        admin_client.patch(f'{url}{review_id}/', data={'score': 2})
+        title.refresh_from_db()
+        assert title.score_sum == 6, (
+            'Проверьте, что изменение оценки обновляет агрегаты рейтинга'
+        )
+
+        admin_client.delete(f'{url}{review_id}/')
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            1, 4, 4.0
+        ), 'Проверьте, что удаление отзыва обновляет агрегаты рейтинга'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_ratings(self, user, admin, title):
+        from reviews.models import Review, Title
+
+        Review.objects.create(title=title, author=user, text='a', score=3)
+        Review.objects.create(title=title, author=admin, text='b', score=8)
+        Title.objects.update(review_count=0, score_sum=0, rating=None)
+
+        call_command('rebuild_ratings')
+
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            2, 11, 5.5
+        ), 'Проверьте, что команда rebuild_ratings пересчитывает рейтинг'
@@ -0,0 +1,130 @@
+import sqlite3
+
+import pytest
+from django.db import connection, connections
+
+REPLICA = 'replica_1'
+
+
+@pytest.fixture
+def replica(admin, user, settings, tmp_path):
+    """Снимок default в отдельном файле SQLite — отстающая реплика."""
+    path = str(tmp_path / 'replica.sqlite3')
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    target.executescript('\n'.join(connection.connection.iterdump()))
+    target.close()
+    connections.databases[REPLICA] = dict(
+        connections.databases['default'], NAME=path, TEST={}
+    )
+    settings.DATABASE_REPLICAS = [REPLICA]
+    yield path
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+def usernames(response):
+    assert response.status_code == 200
+    return {item['username'] for item in response.json()['results']}
+
+
+@pytest.mark.django_db
+class TestReplicaRouting:
+
+    def test_get_reads_replica(self, replica, admin_client,
+                               django_user_model):
+        django_user_model.objects.create(username='fresh', email='f@ya.ru')
+
+        assert 'fresh' not in usernames(admin_client.get('/api/v1/users/')), (
+            'Проверьте, что GET-запросы читают из реплики'
+        )
+        assert django_user_model.objects.filter(username='fresh').exists(), (
+            'Проверьте, что вне запросов чтения идут в default'
+        )
+
+    def test_writes_go_to_primary(self, replica, admin_client,
+                                  django_user_model):
+        fresh = django_user_model.objects.create(
+            username='fresh', email='f@ya.ru'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{fresh.username}/', data={'bio': 'новое'}
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что запросы с записью читают из default'
+        )
+        fresh.refresh_from_db()
+        assert fresh.bio == 'новое'
+
+    def test_read_your_writes(self, replica, admin_client, settings,
+                              monkeypatch):
+        import time
+
+        from django.core.cache import cache
+
+        response = admin_client.post(
+            '/api/v1/users/', data={'username': 'fresh', 'email': 'f@ya.ru'}
+        )
+        assert response.status_code == 201
+
+        # Следующий запрос может попасть в другой воркер со своим
+        # локальным кешем.
+        cache.clear()
+        assert 'fresh' in usernames(admin_client.get('/api/v1/users/')), (
+            'Проверьте, что после записи чтения автора идут в default'
+        )
+
+        now = time.time()
+        monkeypatch.setattr(
+            'django.core.signing.time.time',
+            lambda: now + settings.READ_YOUR_WRITES_WINDOW + 1,
+        )
+        assert 'fresh' not in usernames(admin_client.get('/api/v1/users/')), (
+            'Проверьте, что после READ_YOUR_WRITES_WINDOW чтения снова '
+            'идут в реплику'
+        )
+
+    def test_other_client_reads_replica(self, replica, admin_client,
+                                        token_admin):
+        from rest_framework.test import APIClient
+
+        response = admin_client.post(
+            '/api/v1/users/', data={'username': 'fresh', 'email': 'f@ya.ru'}
+        )
+        assert response.status_code == 201
+        other = APIClient()
+        other.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {token_admin["access"]}'
+        )
+
+        assert 'fresh' not in usernames(other.get('/api/v1/users/'))
+
+    def test_failed_write_does_not_pin(self, replica, admin_client,
+                                       django_user_model):
+        response = admin_client.post('/api/v1/users/', data={})
+        assert response.status_code == 400
+        django_user_model.objects.create(username='fresh', email='f@ya.ru')
+
+        assert 'fresh' not in usernames(admin_client.get('/api/v1/users/'))
+
+    def test_fresh_cache_namespace_reads_primary(self, replica, admin_client,
+                                                 category):
+        from reviews.models import Title
+
+        Title.objects.create(name='Новое', year=2000, category=category)
+
+        response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert [item['name'] for item in response.json()['results']] == [
+            'Новое'
+        ], (
+            'Проверьте, что недавно изменённые данные читаются из default, '
+            'чтобы отставание реплики не попало в кеш ответов'
+        )
+
+    def test_no_replicas(self, admin_client, django_user_model):
+        django_user_model.objects.create(username='fresh', email='f@ya.ru')
+
+        assert 'fresh' in usernames(admin_client.get('/api/v1/users/'))
@@ -0,0 +1,65 @@
+import pytest
+
+
+class TestSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_ranks_titles_reviews_and_comments(self, client, user,
+                                                      title):
+        from reviews.models import Comments, Review, Title
+
+        other = Title.objects.create(
+            name='Другое', year=2001, description='Про чудо и не только'
+        )
+        review = Review.objects.create(
+            title=other, author=user, text='Настоящее чудо', score=9
+        )
+        Comments.objects.create(review=review, author=user, text='Чудо!')
+
+        response = client.get('/api/v1/search/?q=чудо')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert {result['kind'] for result in results} == {
+            'title', 'review', 'comment'
+        }
+        assert results[0]['id'] == title.id, (
+            'Проверьте, что совпадение в названии ранжируется выше текста'
+        )
+        comment = next(
+            result for result in results if result['kind'] == 'comment'
+        )
+        assert comment['title_id'] == other.id
+        assert comment['review_id'] == review.id
+
+        response = client.get('/api/v1/search/?q=чудо&type=review')
+        assert [result['id'] for result in response.json()['results']] == [
+            review.id
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_follows_changes(self, client, title):
+        title.name = 'Переименовано'
+        title.save()
+        assert client.get('/api/v1/search/?q=чудо').json()['count'] == 0
+        assert client.get(
+            '/api/v1/search/?q=переименовано'
+        ).json()['count'] == 1
+
+        title.delete()
+        assert client.get(
+            '/api/v1/search/?q=переименовано'
+        ).json()['count'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_search_index(self, client, title):
+        from django.core.management import call_command
+        from search.models import SearchDocument
+
+        SearchDocument.objects.all().delete()
+        call_command('rebuild_search_index')
+        assert client.get('/api/v1/search/?q=чудо').json()['count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_unknown_type(self, client):
+        response = client.get('/api/v1/search/?q=чудо&type=user')
+        assert response.status_code == 400
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response.json(), [query['sql'] for query in context.captured_queries]
+
+
+class TestSparseFields:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_titles(self, client, title):
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+
+        assert data['results'] == [
+            {'id': title.id, 'name': 'Чудо', 'rating': None}
+        ], 'Проверьте, что ?fields= оставляет только перечисленные поля'
+        assert len(queries) == 2, (
+            'Проверьте, что без полей genre и category связи не загружаются'
+        )
+        assert 'description' not in queries[-1]
+        assert 'reviews_categories' not in queries[-1]
+
+        data, queries = get_with_queries(
+            client, f'/api/v1/titles/{title.id}/?fields=category,genre'
+        )
+        assert data == {
+            'category': {'name': 'Фильм', 'slug': 'movie'},
+            'genre': [
+                {'name': 'Драма', 'slug': 'drama'},
+                {'name': 'Комедия', 'slug': 'comedy'},
+            ],
+        }
+        assert len(queries) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reviews_and_comments(self, client, admin, user, title):
+        from reviews.models import Comments, Review
+
+        review = Review.objects.create(
+            title=title, author=admin, text='Хорошо', score=8
+        )
+        Review.objects.create(title=title, author=user, text='Да', score=6)
+        Comments.objects.create(review=review, author=user, text='Согласен')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+
+        data, queries = get_with_queries(client, f'{url}?fields=id,score')
+        assert data['results'] == [
+            {'id': review.id, 'score': 8},
+            {'id': review.id + 1, 'score': 6},
+        ]
+        assert '"text"' not in queries[-1]
+        assert 'users_user' not in queries[-1]
+
+        data, queries = get_with_queries(client, url)
+        assert [item['author'] for item in data['results']] == [
+            admin.username, user.username
+        ]
+        assert len(queries) == 2, (
+            'Проверьте, что авторы отзывов загружаются одним запросом'
+        )
+
+        data, _ = get_with_queries(
+            client, f'{url}?cursor=&fields=score'
+        )
+        assert data['results'] == [{'score': 8}, {'score': 6}]
+
+        data, _ = get_with_queries(
+            client, f'{url}{review.id}/comments/?fields=text,author'
+        )
+        assert data['results'] == [
+            {'text': 'Согласен', 'author': user.username}
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_unknown_field(self, client, title):
+        response = client.get('/api/v1/titles/?fields=name,password')
+        assert response.status_code == 400
+        assert 'fields' in response.json()
@@ -0,0 +1,15 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def assert_max_queries(client, url, max_queries, method='get', **kwargs):
+    """Выполняет запрос и проверяет, что он уложился в max_queries."""
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    executed = len(context.captured_queries)
+    sql = '\n'.join(query['sql'] for query in context.captured_queries)
+    assert executed <= max_queries, (
+        f'Запрос {method.upper()} {url} выполнил {executed} SQL-запросов, '
+        f'ожидалось не больше {max_queries}:\n{sql}'
+    )
+    return response